@@ -9,16 +9,32 @@ This is the core of your interview demo!
 
 import os
 import json
-from typing import Optional
+import asyncio
+import time
+from typing import Iterator, Optional
 from dataclasses import dataclass
 from dotenv import load_dotenv
 import anthropic
 
-from tools import ALL_TOOLS, execute_tool
+from history import HistoryManager
+from model_routing import ModelRoute, ModelRoutingPolicy
+from router import FastPathRouter
+from tools import (
+    ALL_TOOLS,
+    DEFAULT_MAX_PARALLEL_TOOLS,
+    aexecute_tools,
+    execute_tools,
+    format_terminal_result
+)
+from tools.clients import get_async_client, get_client
+from tools.models import STRONG_MODEL
 from prompts.system_prompt import SYSTEM_PROMPT
 
 load_dotenv()
 
+# Marks the end of a cacheable prompt prefix
+CACHE_CONTROL = {"type": "ephemeral"}
+
 
 @dataclass
 class ConversationTurn:
@@ -29,6 +45,23 @@ class ConversationTurn:
     tool_results: Optional[list] = None
 
 
+@dataclass
+class StreamEvent:
+    """
+    Event yielded by EdaCopilot.chat_stream().
+
+    type is one of:
+    - "text": a text delta from Claude (text)
+    - "tool_call": Claude requested a tool (tool_name, tool_input)
+    - "tool_result": a tool finished (tool_name, text holds the result)
+    - "done": final answer complete (text holds the full answer)
+    """
+    type: str
+    text: str = ""
+    tool_name: Optional[str] = None
+    tool_input: Optional[dict] = None
+
+
 class EdaCopilot:
     """
     EDA Copilot - An AI assistant for analog circuit design.
@@ -63,22 +96,92 @@ class EdaCopilot:
     └─────────────────────────────────────────────────────────┘
     """
 
-    def __init__(self, model: str = "claude-sonnet-4-20250514"):
+    def __init__(
+        self,
+        model: str = STRONG_MODEL,
+        max_parallel_tools: int = DEFAULT_MAX_PARALLEL_TOOLS,
+        prompt_cache: bool = True,
+        history_token_budget: int = 24000,
+        max_tool_rounds: int = 10,
+        fast_path: bool = False,
+        router: Optional[FastPathRouter] = None,
+        fast_answers: bool = False,
+        routing: Optional[ModelRoutingPolicy] = None
+    ):
         """
         Initialize the EDA Copilot agent.
 
         Args:
-            model: Claude model to use
+            model: Claude model to use for every turn (when routing is not set)
+            max_parallel_tools: Maximum number of tools run concurrently per turn
+            prompt_cache: Add prompt-cache breakpoints to every request
+            history_token_budget: Older history is compacted beyond this size
+            max_tool_rounds: Maximum tool-use iterations for one user message
+            fast_path: Answer simple rule lookups locally, without calling Claude
+            router: Router used for the fast path (a default one if not given)
+            fast_answers: Return terminal tool results (a rule value, generated
+                SKILL code) directly instead of letting Claude rephrase them
+            routing: Per-turn model routing policy, e.g. ModelRoutingPolicy()
+                for a fast model on tool selection and a strong one on generation
         """
-        self.client = anthropic.Anthropic()
         self.model = model
+        self.routing = routing or ModelRoutingPolicy.single_model(model)
+        self.max_parallel_tools = max_parallel_tools
         self.conversation_history: list[dict] = []
         self.system_prompt = SYSTEM_PROMPT
+        self.prompt_cache = prompt_cache
+        self.history = HistoryManager(token_budget=history_token_budget)
+        self.max_tool_rounds = max_tool_rounds
+        self.router = router or (FastPathRouter() if fast_path else None)
+        self.fast_answers = fast_answers
+        # Token usage of every API call (see get_usage_summary)
+        self.usage_log: list[dict] = []
+        # Private event loop backing the synchronous chat() wrapper
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def client(self) -> anthropic.Anthropic:
+        """Shared, connection-pooled client (looked up per call, so configure_clients() applies)"""
+        return get_client()
+
+    @property
+    def async_client(self) -> anthropic.AsyncAnthropic:
+        """Shared async client of the running event loop"""
+        return get_async_client()
 
     def chat(self, user_message: str, verbose: bool = True) -> str:
         """
         Send a message to the agent and get a response.
 
+        Synchronous wrapper around achat(). Must not be called from
+        inside a running event loop; await achat() there instead.
+
+        Args:
+            user_message: User's input message
+            verbose: Print intermediate steps
+
+        Returns:
+            Agent's final response text
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("chat() called from a running event loop - use 'await achat()' instead")
+
+        # Reuse one loop so the async client keeps its connection pool
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(self.achat(user_message, verbose=verbose))
+
+    async def achat(self, user_message: str, verbose: bool = True) -> str:
+        """
+        Send a message to the agent and get a response (async).
+
+        One event loop can drive many EdaCopilot sessions concurrently,
+        e.g. with asyncio.gather(), since no call here blocks the loop.
+
         This implements the agentic loop:
         1. Send message with available tools
         2. If Claude wants to use tools, execute them
@@ -103,16 +206,27 @@ class EdaCopilot:
             print(f"USER: {user_message}")
             print('='*60)
 
+        # Deterministic lookups are answered without a model round trip
+        fast_answer = self._try_fast_path(user_message)
+        if fast_answer is not None:
+            if verbose:
+                print(f"\n[COPILOT RESPONSE - fast path]\n{fast_answer}")
+            return fast_answer
+
         # Agentic loop
-        while True:
+        for _ in range(self.max_tool_rounds):
+            # Keep the request within the history token budget
+            self.conversation_history = self.history.compact(self.conversation_history)
+
             # Call Claude with tools
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=4096,
-                system=self.system_prompt,
-                tools=ALL_TOOLS,
-                messages=self.conversation_history
-            )
+            route = self.routing.select(self.conversation_history)
+            started = time.perf_counter()
+            response = await self.async_client.messages.create(**self._request_kwargs(route))
+            usage = self._record_usage(response.usage, route, time.perf_counter() - started)
+
+            if verbose and (usage["cache_read_input_tokens"] or usage["cache_creation_input_tokens"]):
+                print(f"\n[CACHE] read {usage['cache_read_input_tokens']} / "
+                      f"write {usage['cache_creation_input_tokens']} input tokens")
 
             # Check for tool use
             tool_use_blocks = [
@@ -131,15 +245,18 @@ class EdaCopilot:
                     "content": response.content
                 })
 
-                # Execute each tool
-                tool_results = []
-                for tool_use in tool_use_blocks:
-                    if verbose:
+                if verbose:
+                    for tool_use in tool_use_blocks:
                         print(f"  → {tool_use.name}({json.dumps(tool_use.input)[:100]}...)")
 
-                    # Execute tool
-                    result = execute_tool(tool_use.name, tool_use.input)
+                # Execute all tools of this turn concurrently
+                results = await aexecute_tools(
+                    [(tool_use.name, tool_use.input) for tool_use in tool_use_blocks],
+                    max_concurrency=self.max_parallel_tools
+                )
 
+                tool_results = []
+                for tool_use, result in zip(tool_use_blocks, results):
                     if verbose:
                         # Print truncated result
                         preview = result[:200] + "..." if len(result) > 200 else result
@@ -157,12 +274,16 @@ class EdaCopilot:
                     "content": tool_results
                 })
 
+                # Skip the summarizing call when the tool output is the answer
+                final_text = self._terminal_answer(tool_use_blocks, results)
+                if final_text is not None:
+                    if verbose:
+                        print(f"\n[COPILOT RESPONSE - fast answer]\n{final_text}")
+                    return final_text
+
             else:
                 # Claude gave final answer
-                final_text = ""
-                for block in response.content:
-                    if hasattr(block, 'text'):
-                        final_text += block.text
+                final_text = self._final_text(response.content)
 
                 # Add to history
                 self.conversation_history.append({
@@ -175,21 +296,276 @@ class EdaCopilot:
 
                 return final_text
 
-            # Safety limit
-            if len(self.conversation_history) > 20:
-                return "Maximum conversation length reached. Please start a new conversation."
+        # Safety limit
+        return self._tool_limit_reached()
+
+    def chat_stream(self, user_message: str) -> Iterator[StreamEvent]:
+        """
+        Send a message and stream the response as it is generated.
+
+        Same agentic loop as achat(), but built on the streaming API:
+        text deltas and tool calls are yielded as soon as they arrive,
+        so the first tokens show up long before the answer is complete.
+
+        Args:
+            user_message: User's input message
+
+        Yields:
+            StreamEvent objects, ending with a "done" event
+        """
+        self.conversation_history.append({
+            "role": "user",
+            "content": user_message
+        })
+
+        fast_answer = self._try_fast_path(user_message)
+        if fast_answer is not None:
+            yield StreamEvent(type="text", text=fast_answer)
+            yield StreamEvent(type="done", text=fast_answer)
+            return
+
+        for _ in range(self.max_tool_rounds):
+            self.conversation_history = self.history.compact(self.conversation_history)
+
+            route = self.routing.select(self.conversation_history)
+            started = time.perf_counter()
+            with self.client.messages.stream(**self._request_kwargs(route)) as stream:
+                for event in stream:
+                    if event.type == "text":
+                        yield StreamEvent(type="text", text=event.text)
+                    elif event.type == "content_block_stop" and event.content_block.type == "tool_use":
+                        yield StreamEvent(
+                            type="tool_call",
+                            tool_name=event.content_block.name,
+                            tool_input=event.content_block.input
+                        )
+                response = stream.get_final_message()
+            self._record_usage(response.usage, route, time.perf_counter() - started)
+
+            tool_use_blocks = [
+                block for block in response.content
+                if block.type == "tool_use"
+            ]
+
+            if tool_use_blocks:
+                self.conversation_history.append({
+                    "role": "assistant",
+                    "content": response.content
+                })
+
+                # Execute all tools of this turn concurrently
+                results = execute_tools(
+                    [(tool_use.name, tool_use.input) for tool_use in tool_use_blocks],
+                    max_workers=self.max_parallel_tools
+                )
+
+                tool_results = []
+                for tool_use, result in zip(tool_use_blocks, results):
+                    yield StreamEvent(type="tool_result", text=result, tool_name=tool_use.name)
+                    tool_results.append({
+                        "type": "tool_result",
+                        "tool_use_id": tool_use.id,
+                        "content": result
+                    })
+
+                self.conversation_history.append({
+                    "role": "user",
+                    "content": tool_results
+                })
+
+                final_text = self._terminal_answer(tool_use_blocks, results)
+                if final_text is not None:
+                    yield StreamEvent(type="text", text=final_text)
+                    yield StreamEvent(type="done", text=final_text)
+                    return
+
+            else:
+                final_text = self._final_text(response.content)
+                self.conversation_history.append({
+                    "role": "assistant",
+                    "content": final_text
+                })
+                yield StreamEvent(type="done", text=final_text)
+                return
+
+        # Safety limit
+        yield StreamEvent(type="done", text=self._tool_limit_reached())
+
+    def _try_fast_path(self, user_message: str) -> Optional[str]:
+        """
+        Answer the pending user message through the router, if enabled.
+
+        On a hit the answer is added to the history like a model reply,
+        so follow-up questions still see it.
+        """
+        if self.router is None:
+            return None
+
+        result = self.router.route(user_message)
+        if result is None:
+            return None
+
+        self.conversation_history.append({
+            "role": "assistant",
+            "content": result.answer
+        })
+        return result.answer
+
+    def _terminal_answer(self, tool_use_blocks: list, results: list[str]) -> Optional[str]:
+        """
+        Final answer built from terminal tool results (fast-answers mode).
+
+        Only used when every tool of the round returned a terminal result;
+        the answer is added to the history as the assistant's reply.
+        """
+        if not self.fast_answers:
+            return None
+
+        answers = []
+        for tool_use, result in zip(tool_use_blocks, results):
+            answer = format_terminal_result(tool_use.name, result)
+            if answer is None:
+                return None
+            answers.append(answer)
+
+        final_text = "\n\n".join(answers)
+        self.conversation_history.append({
+            "role": "assistant",
+            "content": final_text
+        })
+        return final_text
+
+    def _tool_limit_reached(self) -> str:
+        """
+        Close a turn that hit max_tool_rounds.
+
+        The history ends with tool results at this point; an assistant
+        message is added so the next user message keeps roles alternating.
+        """
+        message = (f"Stopped after {self.max_tool_rounds} tool rounds without a final answer. "
+                   "Please rephrase or narrow down the request.")
+        self.conversation_history.append({
+            "role": "assistant",
+            "content": message
+        })
+        return message
+
+    def _request_kwargs(self, route: ModelRoute) -> dict:
+        """
+        Arguments for one messages.create()/messages.stream() call.
+
+        Model and max_tokens come from the route picked for this turn.
+
+        With prompt caching on, breakpoints are placed on the tool list,
+        the system prompt and the last history message. Each iteration
+        only appends to the history, so the next request re-reads the
+        whole previous prompt from cache instead of reprocessing it.
+        """
+        if not self.prompt_cache:
+            return {
+                "model": route.model,
+                "max_tokens": route.max_tokens,
+                "system": self.system_prompt,
+                "tools": ALL_TOOLS,
+                "messages": self.conversation_history
+            }
+
+        tools = ALL_TOOLS[:-1] + [{**ALL_TOOLS[-1], "cache_control": CACHE_CONTROL}]
+        system = [{"type": "text", "text": self.system_prompt, "cache_control": CACHE_CONTROL}]
+
+        return {
+            "model": route.model,
+            "max_tokens": route.max_tokens,
+            "system": system,
+            "tools": tools,
+            "messages": self._messages_with_cache_breakpoint()
+        }
+
+    def _messages_with_cache_breakpoint(self) -> list[dict]:
+        """Copy of the history with a cache breakpoint on the last message"""
+        messages = list(self.conversation_history)
+        if not messages:
+            return messages
+
+        last = messages[-1]
+        content = last["content"]
+        if isinstance(content, str):
+            blocks = [{"type": "text", "text": content, "cache_control": CACHE_CONTROL}]
+        elif content and isinstance(content[-1], dict):
+            blocks = content[:-1] + [{**content[-1], "cache_control": CACHE_CONTROL}]
+        else:
+            # SDK content blocks: leave this message without a breakpoint
+            return messages
+
+        messages[-1] = {**last, "content": blocks}
+        return messages
+
+    def _record_usage(self, usage, route: ModelRoute, latency_s: float) -> dict:
+        """Store token usage of one API call, including prompt-cache reads/writes"""
+        self.routing.record(route, latency_s, usage.input_tokens, usage.output_tokens)
+        entry = {
+            "input_tokens": usage.input_tokens,
+            "output_tokens": usage.output_tokens,
+            "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", None) or 0,
+            "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", None) or 0,
+        }
+        self.usage_log.append(entry)
+        return entry
+
+    def get_usage_summary(self) -> dict:
+        """Total token usage over all API calls of this session"""
+        summary = {
+            "api_calls": len(self.usage_log),
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+        }
+        for entry in self.usage_log:
+            for key, value in entry.items():
+                summary[key] += value
+
+        prompt_tokens = (summary["input_tokens"] + summary["cache_creation_input_tokens"]
+                         + summary["cache_read_input_tokens"])
+        summary["cache_hit_ratio"] = (
+            summary["cache_read_input_tokens"] / prompt_tokens if prompt_tokens else 0.0
+        )
+        return summary
+
+    @staticmethod
+    def _final_text(content: list) -> str:
+        """Concatenate the text blocks of a response"""
+        final_text = ""
+        for block in content:
+            if hasattr(block, 'text'):
+                final_text += block.text
+        return final_text
 
     def reset(self):
         """Clear conversation history"""
         self.conversation_history = []
 
+    def close(self):
+        """Release the event loop used by chat()"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.close()
+        self._loop = None
+
+    def get_route_metrics(self) -> dict:
+        """Per-route model, call count, latency and tokens"""
+        return self.routing.metrics()
+
+    def get_router_stats(self) -> Optional[dict]:
+        """Fast-path hit rate, or None when the fast path is disabled"""
+        return self.router.stats() if self.router else None
+
     def get_conversation_summary(self) -> str:
         """Get a summary of the current conversation"""
         turns = len([m for m in self.conversation_history if m["role"] == "user"])
         return f"Conversation with {turns} user messages"
 
 
-def interactive_mode():
+def interactive_mode(fast_path: bool = False, route_models: bool = False):
     """Run the agent in interactive mode"""
     print("""
 ╔═══════════════════════════════════════════════════════════════════╗
@@ -199,6 +575,7 @@ def interactive_mode():
 ║  Commands:                                                        ║
 ║    - Type your question to get help                               ║
 ║    - 'reset' - Clear conversation history                         ║
+║    - 'stats' - Show token usage and fast-path hit rate            ║
 ║    - 'quit' or 'exit' - Exit the program                          ║
 ║                                                                   ║
 ║  Example queries:                                                 ║
@@ -208,7 +585,10 @@ def interactive_mode():
 ╚═══════════════════════════════════════════════════════════════════╝
     """)
 
-    copilot = EdaCopilot()
+    copilot = EdaCopilot(
+        fast_path=fast_path,
+        routing=ModelRoutingPolicy() if route_models else None
+    )
 
     while True:
         try:
@@ -226,8 +606,21 @@ def interactive_mode():
                 print("\n[SYSTEM] Conversation cleared.")
                 continue
 
-            # Get response from copilot
-            copilot.chat(user_input)
+            if user_input.lower() == 'stats':
+                print(f"\n[SYSTEM] Usage: {copilot.get_usage_summary()}")
+                print(f"[SYSTEM] Routes: {copilot.get_route_metrics()}")
+                print(f"[SYSTEM] Fast path: {copilot.get_router_stats()}")
+                continue
+
+            # Stream the response from copilot as it is generated
+            print("\n[COPILOT] ", end="", flush=True)
+            for event in copilot.chat_stream(user_input):
+                if event.type == "text":
+                    print(event.text, end="", flush=True)
+                elif event.type == "tool_call":
+                    print(f"\n  → {event.tool_name}({json.dumps(event.tool_input)[:100]}...)", flush=True)
+                elif event.type == "done":
+                    print()
 
         except KeyboardInterrupt:
             print("\n\nInterrupted. Goodbye!")
@@ -273,4 +666,4 @@ if __name__ == "__main__":
     if len(sys.argv) > 1 and sys.argv[1] == "--demo":
         demo_mode()
     else:
-        interactive_mode()
+        interactive_mode(fast_path="--fast" in sys.argv, route_models="--route" in sys.argv)
@@ -0,0 +1,207 @@
+"""
+Conversation History Manager
+
+Keeps the conversation sent to Claude within a token budget.
+Long design sessions accumulate large tool results (netlists, JSON
+rule dumps); instead of stopping the session, older content is
+compacted step by step:
+
+1. Old tool_result payloads are replaced by a short placeholder
+2. Old turns are collapsed into a plain-text summary
+3. The most recent turns are always kept verbatim
+"""
+
+import json
+
+SUMMARY_HEADER = "[Summary of the earlier conversation]"
+SUMMARY_ACK = "Understood, I'll keep that context in mind."
+ELIDED_MARKER = "output elided from history"
+
+
+def block_field(block, name: str):
+    """Read a field from a content block (dict or SDK object)"""
+    if isinstance(block, dict):
+        return block.get(name)
+    return getattr(block, name, None)
+
+
+def content_text(content) -> str:
+    """Flatten message content (string or list of blocks) to plain text"""
+    if isinstance(content, str):
+        return content
+
+    parts = []
+    for block in content:
+        block_type = block_field(block, "type")
+        if block_type == "text":
+            parts.append(block_field(block, "text") or "")
+        elif block_type == "tool_use":
+            parts.append(f"{block_field(block, 'name')}({json.dumps(block_field(block, 'input'))})")
+        elif block_type == "tool_result":
+            result = block_field(block, "content")
+            parts.append(result if isinstance(result, str) else content_text(result or []))
+    return "\n".join(parts)
+
+
+def estimate_tokens(messages: list[dict]) -> int:
+    """Rough token estimate (~4 characters per token)"""
+    return sum(len(content_text(m["content"])) for m in messages) // 4 + 4 * len(messages)
+
+
+class HistoryManager:
+    """
+    Compacts conversation history to fit a token budget.
+
+    A turn starts with a user message holding plain text and contains
+    every assistant/tool_result message up to the next one. Turns are
+    only ever elided or collapsed as a whole, so tool_use/tool_result
+    pairs stay valid.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 24000,
+        keep_recent_turns: int = 3,
+        target_ratio: float = 0.75,
+        summary_chars: int = 300,
+        max_summary_lines: int = 40
+    ):
+        """
+        Args:
+            token_budget: Compaction starts when the history exceeds this
+            keep_recent_turns: Number of latest turns kept verbatim
+            target_ratio: Compact down to this fraction of the budget, so the
+                prefix stays stable (and prompt-cacheable) for several turns
+            summary_chars: Characters kept per message in turn summaries
+            max_summary_lines: Oldest summary lines are dropped beyond this
+        """
+        self.token_budget = token_budget
+        self.keep_recent_turns = keep_recent_turns
+        self.target_ratio = target_ratio
+        self.summary_chars = summary_chars
+        self.max_summary_lines = max_summary_lines
+        self.compactions = 0
+
+    def compact(self, messages: list[dict]) -> list[dict]:
+        """
+        Return a history that fits the token budget.
+
+        Args:
+            messages: Conversation history (not modified)
+
+        Returns:
+            The same list if within budget, otherwise a compacted copy
+        """
+        if estimate_tokens(messages) <= self.token_budget:
+            return messages
+
+        target = int(self.token_budget * self.target_ratio)
+        summary, turns = self._split_turns(messages)
+        old, recent = self._split_recent(turns)
+
+        # Step 1: elide tool outputs of old turns
+        old = [self._elide_tool_results(turn) for turn in old]
+        if estimate_tokens(self._join(summary, old + recent)) > target:
+            # Step 2: collapse old turns into the summary
+            summary = self._summarize(summary, old)
+            old = []
+
+        # Step 3: still too large - collapse recent turns too, except the current one
+        while len(recent) > 1 and estimate_tokens(self._join(summary, recent)) > target:
+            summary = self._summarize(summary, [recent.pop(0)])
+
+        self.compactions += 1
+        return self._join(summary, old + recent)
+
+    def _split_turns(self, messages: list[dict]) -> tuple[list[str], list[list[dict]]]:
+        """Split history into (existing summary lines, turns)"""
+        summary = []
+        turns: list[list[dict]] = []
+
+        for message in messages:
+            content = message["content"]
+            if message["role"] == "user" and isinstance(content, str):
+                if content.startswith(SUMMARY_HEADER):
+                    summary = content[len(SUMMARY_HEADER):].strip().splitlines()
+                    continue
+                turns.append([message])
+            elif turns:
+                turns[-1].append(message)
+            # Anything else belongs to the summary exchange (its acknowledgement)
+
+        return summary, turns
+
+    def _split_recent(self, turns: list[list[dict]]) -> tuple[list, list]:
+        """Split turns into (old, recent)"""
+        keep = max(1, self.keep_recent_turns)
+        return turns[:-keep], turns[-keep:]
+
+    def _elide_tool_results(self, turn: list[dict]) -> list[dict]:
+        """Replace tool_result payloads of a turn with short placeholders"""
+        tool_names = {}
+        for message in turn:
+            if message["role"] == "assistant" and not isinstance(message["content"], str):
+                for block in message["content"]:
+                    if block_field(block, "type") == "tool_use":
+                        tool_names[block_field(block, "id")] = block_field(block, "name")
+
+        elided = []
+        for message in turn:
+            content = message["content"]
+            if message["role"] == "user" and isinstance(content, list):
+                content = [self._elide_block(block, tool_names) for block in content]
+                message = {**message, "content": content}
+            elided.append(message)
+        return elided
+
+    @staticmethod
+    def _elide_block(block: dict, tool_names: dict) -> dict:
+        result = block.get("content")
+        if block.get("type") != "tool_result" or (isinstance(result, str) and ELIDED_MARKER in result):
+            return block
+        size = len(result) if isinstance(result, str) else len(content_text(result or []))
+        name = tool_names.get(block.get("tool_use_id"), "tool")
+        return {
+            "type": "tool_result",
+            "tool_use_id": block["tool_use_id"],
+            "content": f"[{name} {ELIDED_MARKER} ({size} chars)]"
+        }
+
+    def _summarize(self, summary: list[str], turns: list[list[dict]]) -> list[str]:
+        """Append one summary block per turn"""
+        summary = list(summary)
+        for turn in turns:
+            question = content_text(turn[0]["content"])
+            summary.append(f"- User: {self._shorten(question)}")
+
+            tools_used = []
+            for message in turn[1:]:
+                if message["role"] == "assistant" and not isinstance(message["content"], str):
+                    tools_used += [block_field(b, "name") for b in message["content"]
+                                   if block_field(b, "type") == "tool_use"]
+            if tools_used:
+                summary.append(f"  Tools: {', '.join(tools_used)}")
+
+            answer = turn[-1]
+            if answer["role"] == "assistant":
+                summary.append(f"  Copilot: {self._shorten(content_text(answer['content']))}")
+
+        return summary[-self.max_summary_lines:]
+
+    def _shorten(self, text: str) -> str:
+        text = " ".join(text.split())
+        if len(text) > self.summary_chars:
+            return text[:self.summary_chars] + "..."
+        return text
+
+    @staticmethod
+    def _join(summary: list[str], turns: list[list[dict]]) -> list[dict]:
+        """Rebuild a message list from summary lines and turns"""
+        messages: list[dict] = []
+        if summary:
+            messages.append({"role": "user", "content": SUMMARY_HEADER + "\n" + "\n".join(summary)})
+            messages.append({"role": "assistant", "content": SUMMARY_ACK})
+        for turn in turns:
+            messages.extend(turn)
+        return messages
+
@@ -0,0 +1,143 @@
+"""
+Model Routing Policy
+
+Picks the model and max_tokens for each iteration of the agentic loop.
+Cheap turns (choosing a tool, phrasing a short rule answer) go to a
+small, fast model; SKILL generation and circuit analysis go to the
+larger one. Per-route latency and token metrics show the savings.
+
+Note: prompt caches are per model, so alternating models within one
+conversation trades some cache hits for faster, cheaper calls.
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from history import block_field
+from tools.models import FAST_MODEL, STRONG_MODEL
+
+GENERATION_PATTERN = re.compile(
+    r"\b(?:generate|write|code|skill|script|procedure|function|modify|refactor|automate)\b",
+    re.IGNORECASE
+)
+ANALYSIS_PATTERN = re.compile(
+    r"\b(?:analy[sz]e|analysis|netlist|debug|why|compare|explain|topology|simulat\w*)\b",
+    re.IGNORECASE
+)
+
+# Which route summarizes the results of each tool
+TOOL_ROUTES = {
+    "generate_skill_code": "generation",
+    "analyze_circuit": "analysis",
+}
+
+
+@dataclass
+class ModelRoute:
+    """Model settings for one type of turn"""
+    name: str
+    model: str
+    max_tokens: int
+
+
+class ModelRoutingPolicy:
+    """
+    Chooses a ModelRoute for each request.
+
+    Routes:
+    - tool_selection: first call for a plain question (usually picks a tool)
+    - rule_answer: phrasing the answer from rule lookups
+    - generation: SKILL code generation and refinement
+    - analysis: circuit analysis, debugging, explanations
+    """
+
+    def __init__(self, routes: Optional[dict[str, ModelRoute]] = None):
+        """
+        Args:
+            routes: Route name -> ModelRoute (defaults to fast/strong split)
+        """
+        self.routes = routes or {
+            "tool_selection": ModelRoute("tool_selection", FAST_MODEL, 2048),
+            "rule_answer": ModelRoute("rule_answer", FAST_MODEL, 1024),
+            "generation": ModelRoute("generation", STRONG_MODEL, 4096),
+            "analysis": ModelRoute("analysis", STRONG_MODEL, 4096),
+        }
+        self._metrics = {name: self._empty_metrics() for name in self.routes}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def single_model(cls, model: str, max_tokens: int = 4096) -> "ModelRoutingPolicy":
+        """Policy that sends every turn to the same model (no routing)"""
+        return cls({
+            name: ModelRoute(name, model, max_tokens)
+            for name in ("tool_selection", "rule_answer", "generation", "analysis")
+        })
+
+    def select(self, messages: list[dict]) -> ModelRoute:
+        """
+        Pick the route for the next request.
+
+        Args:
+            messages: Conversation history, ending with the pending user message
+
+        Returns:
+            ModelRoute to use for this request
+        """
+        last = messages[-1]["content"]
+
+        if isinstance(last, str):
+            # New question: classify by intent
+            if GENERATION_PATTERN.search(last):
+                return self.routes["generation"]
+            if ANALYSIS_PATTERN.search(last):
+                return self.routes["analysis"]
+            return self.routes["tool_selection"]
+
+        # Tool results: route by the tools that produced them
+        tool_names = self._last_tool_names(messages)
+        for route in ("generation", "analysis"):
+            if any(TOOL_ROUTES.get(name) == route for name in tool_names):
+                return self.routes[route]
+        return self.routes["rule_answer"]
+
+    def record(self, route: ModelRoute, latency_s: float, input_tokens: int, output_tokens: int) -> None:
+        """Add one API call to the route's metrics"""
+        with self._lock:
+            metrics = self._metrics.setdefault(route.name, self._empty_metrics())
+            metrics["calls"] += 1
+            metrics["total_latency_s"] += latency_s
+            metrics["input_tokens"] += input_tokens
+            metrics["output_tokens"] += output_tokens
+
+    def metrics(self) -> dict:
+        """Per-route call count, model, average latency and token totals"""
+        with self._lock:
+            report = {}
+            for name, metrics in self._metrics.items():
+                calls = metrics["calls"]
+                report[name] = {
+                    "model": self.routes[name].model if name in self.routes else None,
+                    "calls": calls,
+                    "avg_latency_ms": 1000 * metrics["total_latency_s"] / calls if calls else 0.0,
+                    "input_tokens": metrics["input_tokens"],
+                    "output_tokens": metrics["output_tokens"],
+                }
+            return report
+
+    @staticmethod
+    def _empty_metrics() -> dict:
+        return {"calls": 0, "total_latency_s": 0.0, "input_tokens": 0, "output_tokens": 0}
+
+    @staticmethod
+    def _last_tool_names(messages: list[dict]) -> list[str]:
+        """Names of the tools requested by the latest assistant message"""
+        for message in reversed(messages):
+            if message["role"] == "assistant" and not isinstance(message["content"], str):
+                return [
+                    block_field(block, "name")
+                    for block in message["content"]
+                    if block_field(block, "type") == "tool_use"
+                ]
+        return []
@@ -0,0 +1,370 @@
+"""
+Retrieval Benchmark
+Measures how accurate and how fast DesignRuleRetriever is, per backend.
+
+Accuracy is scored on labeled queries (question -> rule_ids that answer
+it): data/benchmark_queries.json for design_rules.txt, or queries
+generated together with a synthetic rule manual of any size (up to
+100k+ rules). For each backend and corpus it reports:
+    recall@k, MRR        accuracy of search()
+    p50 / p95 / p99      single-query latency (caches disabled)
+    build_seconds        time to parse, embed and index the corpus
+    memory               RSS growth while building, index size on disk
+
+Results are written as JSON so runs can be compared between releases.
+
+Usage:
+    python benchmark.py --backends numpy chroma
+    python benchmark.py --synthetic 1000 10000 100000 --embedding-model hashing -o bench.json
+"""
+
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from .config import VECTOR_BACKENDS, VectorStoreConfig
+    from .retriever import DEFAULT_DATA_PATH, DesignRuleRetriever
+except ImportError:
+    from config import VECTOR_BACKENDS, VectorStoreConfig
+    from retriever import DEFAULT_DATA_PATH, DesignRuleRetriever
+
+DEFAULT_QUERIES_PATH = Path(__file__).parent / "data" / "benchmark_queries.json"
+
+# Bumped whenever metrics change meaning, so old result files aren't compared blindly
+BENCHMARK_VERSION = 1
+
+RECALL_AT = (1, 3, 5, 10)
+
+
+@dataclass
+class LabeledQuery:
+    """A benchmark question and the rule IDs that answer it"""
+    question: str
+    expected: list[str]
+
+
+@dataclass
+class BenchmarkResult:
+    """Metrics of one (corpus, backend) run"""
+    corpus: str
+    backend: str
+    embedding_model: str
+    search_mode: str
+    documents: int
+    queries: int
+    build_seconds: float
+    recall: dict[str, float]
+    mrr: float
+    latency_ms: dict[str, float]
+    batch_queries_per_second: float
+    memory: dict[str, float] = field(default_factory=dict)
+
+
+def load_queries(path: str = None) -> list[LabeledQuery]:
+    """Load labeled queries from a JSON file ({"queries": [{"question", "expected"}]})"""
+    data = json.loads(Path(path or DEFAULT_QUERIES_PATH).read_text())
+    return [LabeledQuery(q["question"], list(q["expected"])) for q in data["queries"]]
+
+
+# Synthetic rule manuals
+# Layers and rule templates mirror design_rules.txt; every rule gets a distinct
+# condition so each generated question has exactly one correct answer.
+_BASE_LAYERS = [("POLY", "Poly"), ("ACT", "Active"), ("NWELL", "NWELL"), ("CT", "Contact")]
+
+_TEMPLATES = {
+    "W": ("Minimum Width", "Minimum width of {layer} is {value} {condition_text}."),
+    "S": ("Minimum Spacing", "Spacing between two {layer} shapes must be at least {value} {condition_text}."),
+    "A": ("Minimum Area", "Every {layer} shape must have an area of at least {value} {condition_text}."),
+    "E": ("Enclosure", "{layer} must enclose the layer below by at least {value} {condition_text}."),
+}
+
+
+def _synthetic_layers(n_rules: int) -> list[tuple[str, str]]:
+    # About 250 rules per layer: 100k rules -> ~200 metal and ~200 via layers
+    n_metals = max(2, min(200, n_rules // 500))
+    layers = list(_BASE_LAYERS)
+    for i in range(1, n_metals + 1):
+        layers.append((f"M{i}", f"Metal{i}"))
+        if i < n_metals:
+            layers.append((f"VIA{i}", f"VIA{i}"))
+    return layers
+
+
+def generate_synthetic_rules(
+    path: str,
+    n_rules: int,
+    n_queries: int = 200,
+    seed: int = 0
+) -> list[LabeledQuery]:
+    """
+    Write a DRM-formatted rule manual with n_rules rules.
+
+    Args:
+        path: Output file (design_rules.txt format)
+        n_rules: Number of rules to generate
+        n_queries: Number of labeled queries to sample from the rules
+        seed: Random seed (same seed -> same manual and queries)
+
+    Returns:
+        Labeled queries, each answered by exactly one generated rule
+    """
+    rng = random.Random(seed)
+    layers = _synthetic_layers(n_rules)
+    per_layer = -(-n_rules // len(layers))
+    categories = list(_TEMPLATES)
+
+    queries, written = [], 0
+    sample_every = max(1, n_rules // n_queries) if n_queries else 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"# Synthetic Design Rule Manual ({n_rules} rules, seed {seed})\n\n")
+        for prefix, layer in layers:
+            if written >= n_rules:
+                break
+            f.write("=" * 80 + f"\n{layer.upper()} ({prefix}) RULES\n" + "=" * 80 + "\n\n")
+            for i in range(min(per_layer, n_rules - written)):
+                category = categories[i % len(categories)]
+                number = i // len(categories) + 1
+                rule_id = f"{prefix}.{category}.{number}"
+                title, description = _TEMPLATES[category]
+                value = f"{rng.randint(5, 120)}nm" if category != "A" else f"0.{rng.randint(100, 999):05d}um²"
+                # Distinct width per rule number, so rules of one category stay distinguishable
+                width = 20 + 10 * number
+                condition = f"When width >= {width}nm" if number > 1 else ""
+                condition_text = f"for shapes at least {width}nm wide" if number > 1 else "for all shapes"
+
+                f.write(f"{rule_id} - {title}\nLayer: {layer}\nValue: {value}\n")
+                if condition:
+                    f.write(f"Condition: {condition}\n")
+                f.write("Description: " + description.format(layer=layer, value=value, condition_text=condition_text))
+                f.write("\n\n---\n\n")
+
+                if sample_every and written % sample_every == 0 and len(queries) < n_queries:
+                    question = f"{title.lower()} of {layer}"
+                    if condition:
+                        question += f" for shapes at least {width}nm wide"
+                    queries.append(LabeledQuery(question, [rule_id]))
+                written += 1
+    return queries
+
+
+# Metrics
+def score(results: list[list[dict]], queries: list[LabeledQuery]) -> tuple[dict[str, float], float]:
+    """
+    Recall@k and mean reciprocal rank.
+
+    Args:
+        results: One ranked result list per query (at least max(RECALL_AT) deep)
+        queries: Labeled queries, same order
+
+    Returns:
+        ({"@1": recall, "@3": ...}, MRR)
+    """
+    recall = {k: 0.0 for k in RECALL_AT}
+    reciprocal_ranks = 0.0
+    for question_results, query in zip(results, queries):
+        ranked = [r["metadata"].get("rule_id") for r in question_results]
+        expected = set(query.expected)
+        for k in RECALL_AT:
+            recall[k] += len(expected & set(ranked[:k])) / len(expected)
+        first = next((rank for rank, rule_id in enumerate(ranked, 1) if rule_id in expected), None)
+        reciprocal_ranks += 1.0 / first if first else 0.0
+    n = max(1, len(queries))
+    return {f"@{k}": round(v / n, 4) for k, v in recall.items()}, round(reciprocal_ranks / n, 4)
+
+
+def _rss_mb() -> float:
+    """Current resident set size (Linux), else peak RSS"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def _dir_size_mb(path: Path) -> float:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file()) / 2**20
+
+
+def run_benchmark(
+    data_path: str,
+    queries: list[LabeledQuery],
+    backend: str,
+    corpus: str = None,
+    embedding_model: str = None,
+    search_mode: str = "hybrid",
+    repeats: int = 3
+) -> BenchmarkResult:
+    """
+    Build a fresh index of one corpus with one backend and measure it.
+
+    The index goes to a temporary directory that is removed afterwards,
+    and the retriever caches are disabled so every search is timed cold.
+
+    Args:
+        data_path: Rule manual to index
+        queries: Labeled queries for that manual
+        backend: "chroma" or "numpy"
+        corpus: Name of the corpus in the report (default: file name)
+        embedding_model: Embedder spec (default: VectorStoreConfig default)
+        search_mode: Retriever search mode
+        repeats: Timed passes over the queries for the latency percentiles
+
+    Returns:
+        BenchmarkResult
+    """
+    index_dir = Path(tempfile.mkdtemp(prefix="eda_copilot_bench_"))
+    try:
+        config = VectorStoreConfig(index_dir=index_dir, backend=backend, pdk="benchmark")
+        if embedding_model:
+            config.embedding_model = embedding_model
+
+        rss_before = _rss_mb()
+        started = time.perf_counter()
+        retriever = DesignRuleRetriever(
+            data_path,
+            config=config,
+            search_mode=search_mode,
+            embedding_cache_size=0,
+            result_cache_size=0
+        )
+        build_seconds = time.perf_counter() - started
+        rss_after = _rss_mb()
+
+        questions = [q.question for q in queries]
+        depth = max(RECALL_AT)
+        recall, mrr = score(retriever.search_many(questions, depth), queries)
+
+        # Warm-up (lazy model loading, page cache), then timed single queries
+        retriever.search(questions[0], depth)
+        latencies = []
+        for _ in range(repeats):
+            for question in questions:
+                started = time.perf_counter()
+                retriever.search(question, depth)
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        retriever.search_many(questions, depth)
+        batch_seconds = time.perf_counter() - started
+
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        return BenchmarkResult(
+            corpus=corpus or Path(data_path).name,
+            backend=backend,
+            embedding_model=retriever.store.embedder.name,
+            search_mode=search_mode,
+            documents=retriever.store.count(),
+            queries=len(queries),
+            build_seconds=round(build_seconds, 3),
+            recall=recall,
+            mrr=mrr,
+            latency_ms={
+                "p50": round(float(p50), 3),
+                "p95": round(float(p95), 3),
+                "p99": round(float(p99), 3),
+                "mean": round(float(np.mean(latencies)), 3)
+            },
+            batch_queries_per_second=round(len(questions) / batch_seconds, 1) if batch_seconds else 0.0,
+            memory={
+                "rss_growth_mb": round(rss_after - rss_before, 1),
+                "rss_mb": round(rss_after, 1),
+                "index_disk_mb": round(_dir_size_mb(index_dir), 2)
+            }
+        )
+    finally:
+        shutil.rmtree(index_dir, ignore_errors=True)
+
+
+def run_suite(
+    backends: list[str] = VECTOR_BACKENDS,
+    synthetic_sizes: list[int] = (),
+    embedding_model: str = None,
+    search_mode: str = "hybrid",
+    repeats: int = 3,
+    seed: int = 0
+) -> dict:
+    """
+    Benchmark design_rules.txt and optional synthetic manuals on each backend.
+
+    Returns:
+        JSON-serializable report: {"benchmark_version", "environment", "results": [...]}
+    """
+    corpora = [("design_rules.txt", str(DEFAULT_DATA_PATH), load_queries())]
+    tmp_dir = Path(tempfile.mkdtemp(prefix="eda_copilot_corpus_"))
+    try:
+        for n_rules in synthetic_sizes:
+            path = tmp_dir / f"synthetic_{n_rules}.txt"
+            corpora.append((f"synthetic-{n_rules}", str(path), generate_synthetic_rules(str(path), n_rules, seed=seed)))
+
+        results = []
+        for name, path, queries in corpora:
+            for backend in backends:
+                result = run_benchmark(
+                    path, queries, backend,
+                    corpus=name,
+                    embedding_model=embedding_model,
+                    search_mode=search_mode,
+                    repeats=repeats
+                )
+                results.append(asdict(result))
+                print(
+                    f"{name:>20} {backend:>6}: recall@5={result.recall['@5']:.3f} mrr={result.mrr:.3f} "
+                    f"p50={result.latency_ms['p50']:.2f}ms p99={result.latency_ms['p99']:.2f}ms "
+                    f"build={result.build_seconds:.1f}s",
+                    file=sys.stderr
+                )
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return {
+        "benchmark_version": BENCHMARK_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count()
+        },
+        "results": results
+    }
+
+
+# Run the benchmark from the command line
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark EDA Copilot retrieval")
+    parser.add_argument("--backends", nargs="+", default=list(VECTOR_BACKENDS), choices=VECTOR_BACKENDS)
+    parser.add_argument("--synthetic", nargs="*", type=int, default=[], help="Synthetic corpus sizes (rules)")
+    parser.add_argument("--embedding-model", default=None, help="Embedder spec, e.g. hashing")
+    parser.add_argument("--search-mode", default="hybrid", choices=("hybrid", "vector", "lexical"))
+    parser.add_argument("--repeats", type=int, default=3, help="Timed passes over the queries")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default=None, help="Write the JSON report here (default: stdout)")
+    args = parser.parse_args()
+
+    report = run_suite(
+        backends=args.backends,
+        synthetic_sizes=args.synthetic,
+        embedding_model=args.embedding_model,
+        search_mode=args.search_mode,
+        repeats=args.repeats,
+        seed=args.seed
+    )
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        print(output)
@@ -0,0 +1,99 @@
+"""
+Retrieval Caches
+LRU caches for query embeddings and search results.
+
+Designers repeat the same handful of questions ("min M1 spacing",
+"via enclosure"); a hit skips both the query embedding and the
+vector search. Entries are evicted least-recently-used beyond an entry
+count or an approximate memory cap, and the retriever clears the
+caches whenever the index changes.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+def normalize_query(text: str) -> str:
+    """Cache key form of a query: lowercase, single spaces"""
+    return " ".join(text.lower().split())
+
+
+def result_size(results: list[dict]) -> int:
+    """Approximate memory footprint of a list of search results in bytes"""
+    return sum(
+        sys.getsizeof(r["text"]) + sum(sys.getsizeof(v) for v in r["metadata"].values()) + 200
+        for r in results
+    )
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by entry count and approximate size"""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 8 << 20, sizeof: Callable[[Any], int] = sys.getsizeof):
+        """
+        Args:
+            max_entries: Maximum number of entries
+            max_bytes: Approximate memory cap for all values
+            sizeof: Function giving the size of a value in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting least recently used entries beyond the caps"""
+        if self.max_entries <= 0:
+            return  # Cache disabled
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return  # Would evict everything else and still not fit
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Hit/miss counters, size and memory use"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes
+            }
@@ -0,0 +1,126 @@
+"""
+Vector Store Configuration
+Where the index lives, what it is called, and what it was built from.
+"""
+
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Default index location: next to this package, independent of the working directory
+DEFAULT_INDEX_DIR = Path(__file__).resolve().parent / "chroma_db"
+
+MANIFEST_FILE = "manifest.json"
+
+# Vector store implementations (see vector_store.create_vector_store)
+VECTOR_BACKENDS = ("chroma", "numpy")
+
+
+def _default_index_dir() -> Path:
+    return Path(os.getenv("EDA_COPILOT_INDEX_DIR", DEFAULT_INDEX_DIR)).expanduser().resolve()
+
+
+def _default_backend() -> str:
+    return os.getenv("EDA_COPILOT_VECTOR_BACKEND", "chroma")
+
+
+def _default_embedding_model() -> str:
+    return os.getenv("EDA_COPILOT_EMBEDDING_MODEL", "chroma-default")
+
+
+@dataclass
+class VectorStoreConfig:
+    """
+    Vector store settings.
+
+    Attributes:
+        persistent: Keep the index on disk (False = in-memory, rebuilt every run)
+        index_dir: Absolute index directory (env EDA_COPILOT_INDEX_DIR overrides the default)
+        pdk: PDK name, part of the collection name
+        pdk_version: PDK/DRM version, part of the collection name
+        embedding_model: Embedder that builds the index: "chroma-default", "hashing" (offline)
+                         or "sentence-transformers/<model>" (env EDA_COPILOT_EMBEDDING_MODEL)
+        embedding_batch_size: Texts per embedding batch
+        embedding_workers: Threads encoding batches in parallel
+        backend: "chroma" or "numpy" (env EDA_COPILOT_VECTOR_BACKEND overrides the default)
+        dtype: Embedding dtype of the numpy backend ("float32" or "float16"; float16 halves
+               memory, but every search upcasts the scanned rows to float32)
+    """
+    persistent: bool = True
+    index_dir: Path = field(default_factory=_default_index_dir)
+    pdk: str = "asap7"
+    pdk_version: str = "1.0"
+    embedding_model: str = field(default_factory=_default_embedding_model)
+    embedding_batch_size: int = 64
+    embedding_workers: int = 1
+    backend: str = field(default_factory=_default_backend)
+    dtype: str = "float32"
+
+    def __post_init__(self):
+        self.index_dir = Path(self.index_dir).expanduser().resolve()
+        if self.backend not in VECTOR_BACKENDS:
+            raise ValueError(f"backend must be one of {VECTOR_BACKENDS}, got {self.backend!r}")
+        if self.dtype not in ("float32", "float16"):
+            raise ValueError(f"dtype must be float32 or float16, got {self.dtype!r}")
+
+    @property
+    def collection_name(self) -> str:
+        """One collection per PDK version, e.g. design_rules_asap7_v1_0"""
+        raw = f"design_rules_{self.pdk}_v{self.pdk_version}"
+        return re.sub(r"[^A-Za-z0-9_-]", "_", raw)
+
+
+class IndexManifest:
+    """
+    Records what each collection was built from.
+
+    Stored as manifest.json in the index directory:
+        {"collections": {name: {"source_hash", "embedding_model", "documents", ...}}}
+    For in-memory stores the manifest only lives in memory.
+    """
+
+    def __init__(self, config: VectorStoreConfig):
+        self.path = config.index_dir / MANIFEST_FILE if config.persistent else None
+        # In-memory copy; the only copy for in-memory stores
+        self._data = {"collections": {}}
+
+    def get(self, collection_name: str) -> dict:
+        """Manifest entry of a collection ({} if never built)"""
+        self._data = self._read()
+        return dict(self._data["collections"].get(collection_name, {}))
+
+    def update(self, collection_name: str, **values) -> None:
+        """Merge values into a collection's entry and save"""
+        # Re-read first so entries written by other stores are kept
+        self._data = self._read()
+        entry = self._data["collections"].setdefault(collection_name, {})
+        entry.update(values, updated_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        self._write()
+
+    def remove(self, collection_name: str) -> None:
+        """Forget a collection (after it was cleared)"""
+        self._data = self._read()
+        if self._data["collections"].pop(collection_name, None) is not None:
+            self._write()
+
+    def _read(self) -> dict:
+        if self.path is None:
+            return self._data
+        if self.path.exists():
+            try:
+                return json.loads(self.path.read_text())
+            except (OSError, ValueError):
+                pass  # Unreadable manifest: treat the index as unknown and rebuild
+        return {"collections": {}}
+
+    def _write(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so readers never see a half-written manifest
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._data, indent=2))
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,182 @@
+"""
+Context Packer
+Fits retrieved chunks into a token budget before they reach the LLM.
+
+Search results are not all worth their tokens. The packer:
+- drops chunks whose vector distance is above a threshold, except rules
+  the question names by ID (BM25 finds those; their vector distance may
+  still be large)
+- renders each rule once: ID, layer, title, value and condition on two
+  short lines, then the description (the raw chunk repeats all of these)
+- drops duplicate rules (same rule ID or same text)
+- truncates long descriptions at a word boundary
+- packs greedily by relevance per token, then restores the ranking order
+
+Tokens are estimated at ~4 characters per token, like the history manager.
+"""
+
+from dataclasses import dataclass, field
+
+try:
+    from .lexical import tokenize
+except ImportError:
+    from lexical import tokenize
+
+HEADER = "Relevant Design Rules:\n"
+EMPTY_CONTEXT = "No relevant design rules found."
+ELLIPSIS = "..."
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)"""
+    return len(text) // 4 + 1
+
+
+def cosine_distance(distance: float, metric: str = "cosine") -> float:
+    """
+    Convert a store distance to 1 - cosine similarity.
+
+    Embeddings are normalized, so squared L2 = 2 * (1 - cosine); Chroma's
+    "ip" distance (1 - inner product) already is the cosine distance.
+    """
+    return distance / 2 if metric == "l2" else distance
+
+
+def _field(metadata: dict, name: str) -> str | None:
+    # The document loader stores "N/A" for fields a rule doesn't have
+    value = metadata.get(name)
+    return None if value in (None, "", "N/A") else value
+
+
+def truncate(text: str, max_chars: int) -> str:
+    """Cut text to max_chars at a word boundary, marking the cut"""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max(0, max_chars - len(ELLIPSIS))].rsplit(" ", 1)[0].rstrip(" ,;:")
+    return cut + ELLIPSIS
+
+
+@dataclass
+class PackedContext:
+    """Packed LLM context and what was left out"""
+    text: str
+    tokens: int
+    included: list[str] = field(default_factory=list)  # Rule IDs / chunk IDs, in ranking order
+    dropped: dict[str, int] = field(default_factory=dict)  # Reason -> number of chunks
+
+
+class ContextPacker:
+    """Token-budgeted formatting of search results"""
+
+    def __init__(
+        self,
+        token_budget: int = 600,
+        max_distance: float = 0.9,
+        max_description_chars: int = 300
+    ):
+        """
+        Args:
+            token_budget: Maximum estimated tokens of the packed context
+            max_distance: Drop chunks farther than this cosine distance
+                          (None = keep all; chunks found only by BM25 have no distance)
+            max_description_chars: Descriptions and document chunks are truncated to this
+        """
+        self.token_budget = token_budget
+        self.max_distance = max_distance
+        self.max_description_chars = max_description_chars
+
+    def render(self, result: dict, max_chars: int = None) -> str:
+        """Compact text of one result (every field once)"""
+        max_chars = max_chars or self.max_description_chars
+        metadata = result["metadata"]
+        if "rule_id" not in metadata:
+            # Ingested documentation chunk (see ingest.py)
+            title = f"[Doc {metadata.get('source_file', 'N/A')} - {metadata.get('title', 'N/A')}]"
+            return f"{title}\n{truncate(result['text'], max_chars)}"
+
+        title = f"[Rule {metadata['rule_id']} - {metadata.get('layer', 'N/A')}]"
+        if _field(metadata, "title"):
+            title += f" {_field(metadata, 'title')}"
+        value = f"Value: {metadata.get('value', 'N/A')}"
+        if _field(metadata, "condition"):
+            value += f" ({_field(metadata, 'condition')})"
+        # Old indexes have no parsed description: fall back to the raw text minus the header
+        description = _field(metadata, "description") or "\n".join(result["text"].splitlines()[1:])
+        return f"{title}\n{value}\n{truncate(description, max_chars)}"
+
+    def pack(
+        self,
+        results: list[dict],
+        distance_metric: str = "cosine",
+        token_budget: int = None,
+        question: str = None
+    ) -> PackedContext:
+        """
+        Pack ranked search results into a context string.
+
+        Args:
+            results: Search results, best first (from DesignRuleRetriever.search)
+            distance_metric: Distance function of the store that produced them
+            token_budget: Override of the packer's budget for this call
+            question: The question; rules it names by ID skip the distance filter
+
+        Returns:
+            PackedContext (text is EMPTY_CONTEXT if nothing relevant is left)
+        """
+        budget = token_budget or self.token_budget
+        dropped = {"distance": 0, "duplicate": 0, "budget": 0}
+        named = set(tokenize(question)) if question else set()
+
+        # 1. Relevance filter and dedupe; relevance decays with rank and distance
+        candidates, seen = [], set()
+        for rank, result in enumerate(results):
+            distance = result.get("distance")
+            if str(result["metadata"].get("rule_id", "")).lower() in named:
+                distance = None  # Exact rule ID match: relevant whatever the vector says
+            if distance is not None:
+                distance = cosine_distance(distance, distance_metric)
+                if self.max_distance is not None and distance > self.max_distance:
+                    dropped["distance"] += 1
+                    continue
+            metadata = result["metadata"]
+            key = metadata.get("rule_id") or metadata.get("chunk_id") or result["text"]
+            if key in seen or result["text"] in seen:
+                dropped["duplicate"] += 1
+                continue
+            seen.update((key, result["text"]))
+
+            similarity = 1.0 - distance if distance is not None else 1.0
+            relevance = max(similarity, 0.05) / (rank + 1)
+            text = self.render(result)
+            candidates.append((rank, key, text, relevance))
+
+        if not candidates:
+            dropped = {reason: count for reason, count in dropped.items() if count}
+            return PackedContext(EMPTY_CONTEXT, estimate_tokens(EMPTY_CONTEXT), dropped=dropped)
+
+        # 2. Greedy knapsack on relevance per token; the best chunk is always kept
+        remaining = budget - estimate_tokens(HEADER)
+        best = candidates[0]
+        if estimate_tokens(best[2]) > remaining:
+            # Too long even alone: shrink its description to what fits
+            overhead = estimate_tokens(self.render(results[best[0]], max_chars=1))
+            best = (best[0], best[1], self.render(results[best[0]], max(1, (remaining - overhead) * 4)), best[3])
+        chosen = [best]
+        remaining -= estimate_tokens(best[2])
+        for candidate in sorted(candidates[1:], key=lambda c: c[3] / estimate_tokens(c[2]), reverse=True):
+            cost = estimate_tokens(candidate[2])
+            if cost <= remaining:
+                chosen.append(candidate)
+                remaining -= cost
+            else:
+                dropped["budget"] += 1
+
+        # 3. Output in ranking order
+        chosen.sort(key=lambda c: c[0])
+        text = HEADER + "\n" + "\n\n".join(c[2] for c in chosen) + "\n"
+        return PackedContext(
+            text=text,
+            tokens=estimate_tokens(text),
+            included=[c[1] for c in chosen],
+            dropped={reason: count for reason, count in dropped.items() if count}
+        )
@@ -5,6 +5,7 @@ Loads and chunks design rule documents for embedding.
 
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterator
 import re
 
 
@@ -12,7 +13,62 @@ import re
 class DocumentChunk:
     """Represents a single chunk of a document with metadata."""
     text: str
-    metadata: dict  # rule_id, layer, value, description, etc.
+    metadata: dict  # rule_id, layer, value, condition, description, etc.
+
+
+# Bump when parsing changes, so existing indexes are re-synced
+LOADER_VERSION = 2
+
+# Precompiled once; every line is matched at most against these two
+RULE_HEADER_PATTERN = re.compile(r'^([A-Z0-9]+(?:\.[A-Z0-9]+)+)\s*-\s*(.*)$')
+FIELD_PATTERN = re.compile(r'^(Layer|Value|Condition|Description):\s*(.*)$')
+
+# Metadata key of each field ("N/A" when a rule doesn't have it)
+FIELDS = {"Layer": "layer", "Value": "value", "Condition": "condition", "Description": "description"}
+
+
+def iter_design_rules(file_path: str) -> Iterator[DocumentChunk]:
+    """
+    Stream design rules from a text file, one chunk per rule.
+
+    Reads the file line by line in a single pass, so memory stays bounded
+    by the largest rule and callers can start embedding before the whole
+    manual is parsed. Rules end at a "---" separator, a "===" section
+    banner or the next rule header.
+
+    Args:
+        file_path: Path to the design_rules.txt file
+
+    Returns:
+        Generator of DocumentChunk objects, in file order
+    """
+    rule_lines: list[str] = []
+    with open(file_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            stripped = line.strip()
+
+            if stripped.startswith("#"):
+                continue  # Comment lines (file header)
+            if stripped == "---" or stripped.startswith("==="):
+                chunk = _parse_lines(rule_lines)
+                if chunk:
+                    yield chunk
+                rule_lines = []
+                continue
+
+            if RULE_HEADER_PATTERN.match(stripped) and any(l.strip() for l in rule_lines):
+                # Next rule without a separator in between
+                chunk = _parse_lines(rule_lines)
+                if chunk:
+                    yield chunk
+                rule_lines = []
+
+            rule_lines.append(line)
+
+    chunk = _parse_lines(rule_lines)
+    if chunk:
+        yield chunk
 
 
 def load_design_rules(file_path: str) -> list[DocumentChunk]:
@@ -25,25 +81,7 @@ def load_design_rules(file_path: str) -> list[DocumentChunk]:
     Returns:
         List of DocumentChunk objects, one per rule
     """
-    # TODO 1: Read the file content
-    # Hint: Use Path(file_path).read_text()
-    content = Path(file_path).read_text()
-    # TODO 2: Split into sections by "---" separator
-    # Hint: Use content.split("---")
-    sections = content.split("---")
-    # TODO 3: For each section, call parse_rule() to extract metadata
-    # Hint: Skip empty sections and section headers (lines starting with ===)
-    chunks = []
-    for section in sections:
-        section = section.strip()
-        if not section or section.startswith("==="):
-            continue
-        chunk = parse_rule(section)
-        if chunk:
-            chunks.append(chunk)
-    # TODO 4: Return list of DocumentChunk objects
-
-    return chunks
+    return list(iter_design_rules(file_path))
 
 
 def parse_rule(rule_text: str) -> DocumentChunk | None:
@@ -54,7 +92,9 @@ def parse_rule(rule_text: str) -> DocumentChunk | None:
         M1.W.1 - Minimum Width
         Layer: Metal1
         Value: 18nm
+        Condition: When width >= 50nm      (optional)
         Description: All Metal1 shapes must have minimum width of 18nm.
+                     Continuation lines belong to the previous field.
 
     Args:
         rule_text: Raw text of a single rule
@@ -62,32 +102,42 @@ def parse_rule(rule_text: str) -> DocumentChunk | None:
     Returns:
         DocumentChunk with extracted metadata, or None if invalid
     """
-    # TODO 5: Extract rule_id from first line (e.g., "M1.W.1")
-    # Hint: Use regex r'^([A-Z0-9.]+)\s*-' to match rule ID
-    rule_id_match = re.search(r'^([A-Z0-9.]+)\s*-', rule_text)
-    # TODO 6: Extract layer using regex r'Layer:\s*(.+)'
-    layer_match = re.search(r'Layer:\s*(.+)', rule_text)
-    # TODO 7: Extract value using regex r'Value:\s*(.+)'
-    value_match = re.search(r'Value:\s*(.+)', rule_text)
-    # TODO 8: Extract description using regex r'Description:\s*(.+)'
-    description_match = re.search(r'Description:\s*(.+)', rule_text)
-    # TODO 9: Build metadata dict and return DocumentChunk
-    # metadata = {
-    #     "rule_id": ...,
-    #     "layer": ...,
-    #     "value": ...,
-    #     "source": "ASAP7_DRM"
-    # }
-    if not rule_id_match:
-        return None # Invalid rule format   
+    return _parse_lines(rule_text.splitlines())
+
+
+def _parse_lines(lines: list[str]) -> DocumentChunk | None:
+    """Parse the lines of one rule in a single pass"""
+    # Skip leading blank lines; the first line must be the rule header
+    start = 0
+    while start < len(lines) and not lines[start].strip():
+        start += 1
+    if start == len(lines):
+        return None
+    header = RULE_HEADER_PATTERN.match(lines[start].strip())
+    if not header:
+        return None  # Invalid rule format
+
+    fields: dict[str, list[str]] = {}
+    current = None
+    for line in lines[start + 1:]:
+        stripped = line.strip()
+        if not stripped:
+            continue
+        field = FIELD_PATTERN.match(stripped)
+        if field:
+            current = FIELDS[field.group(1)]
+            fields[current] = [field.group(2).strip()]
+        elif current:
+            # Multi-line field: continuation of the previous field
+            fields[current].append(stripped)
+
     metadata = {
-        "rule_id": rule_id_match.group(1).strip(),
-        "layer": layer_match.group(1).strip() if layer_match else "N/A",
-        "value": value_match.group(1).strip() if value_match else "N/A",
-        "description": description_match.group(1).strip() if description_match else "N/A",
+        "rule_id": header.group(1).strip(),
+        "title": header.group(2).strip(),
+        **{key: " ".join(fields[key]) if key in fields else "N/A" for key in FIELDS.values()},
         "source": "ASAP7_DRM"
     }
-    return DocumentChunk(text=rule_text.strip(), metadata=metadata)             
+    return DocumentChunk(text="\n".join(lines[start:]).strip(), metadata=metadata)
 
 
 # Test function - run this to verify your implementation
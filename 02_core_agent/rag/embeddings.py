@@ -0,0 +1,164 @@
+"""
+Embedding Backends
+Pluggable, batched text embedders for the vector stores.
+
+Every embedder encodes texts in batches (configurable size), optionally
+spread over a thread pool, and exposes a `name` that the index manifest
+records, so an index is never queried or extended with vectors from a
+different model.
+
+Backends:
+- "hashing": feature-hashed character n-grams. Deterministic, offline,
+  no model download (for build farms without network access).
+- "chroma-default": Chroma's default ONNX MiniLM model (downloaded on first use).
+- "sentence-transformers/<model>": a sentence-transformers model (optional dependency).
+"""
+
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class Embedder:
+    """
+    Base class: batching and threading around _encode_batch().
+
+    Subclasses implement _encode_batch(texts) -> (len(texts), dim) array
+    and set `name` to an identifier that changes whenever the vectors do.
+    """
+
+    name = "embedder"
+
+    def __init__(self, batch_size: int = 64, max_workers: int = 1):
+        """
+        Args:
+            batch_size: Texts encoded per call to the model
+            max_workers: Threads encoding batches in parallel (1 = sequential)
+        """
+        self.batch_size = max(1, batch_size)
+        self.max_workers = max(1, max_workers)
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """
+        Encode texts into L2-normalized float32 vectors.
+
+        Args:
+            texts: Texts to encode
+
+        Returns:
+            Array of shape (len(texts), dimension)
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if self.max_workers > 1 and len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                encoded = list(pool.map(self._encode_batch, batches))
+        else:
+            encoded = [self._encode_batch(batch) for batch in batches]
+
+        vectors = np.vstack([np.asarray(batch, dtype=np.float32) for batch in encoded])
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        """Encode a single query (1-D vector)"""
+        return self.embed([text])[0]
+
+    def _encode_batch(self, texts: list[str]) -> np.ndarray:
+        raise NotImplementedError
+
+
+class HashingEmbedder(Embedder):
+    """
+    Feature-hashed character n-grams (offline, deterministic).
+
+    Each n-gram of the lowercased, space-padded text is hashed (CRC32)
+    into one of `dimension` buckets with a hash-derived sign. Close
+    spellings ("Metal1", "metal 1") and exact tokens (rule IDs, values)
+    land on shared buckets; no model or network is needed.
+    """
+
+    def __init__(self, dimension: int = 512, ngram_range: tuple[int, int] = (2, 4), **kwargs):
+        """
+        Args:
+            dimension: Number of hash buckets (vector size)
+            ngram_range: Smallest and largest n-gram length
+            **kwargs: batch_size / max_workers (see Embedder)
+        """
+        super().__init__(**kwargs)
+        self.dimension = dimension
+        self.ngram_range = ngram_range
+        self.name = f"hashing-char{ngram_range[0]}-{ngram_range[1]}-d{dimension}"
+
+    def _encode_batch(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        low, high = self.ngram_range
+        for row, text in enumerate(texts):
+            padded = f" {' '.join(text.lower().split())} "
+            for n in range(low, high + 1):
+                for i in range(len(padded) - n + 1):
+                    digest = zlib.crc32(padded[i:i + n].encode("utf-8"))
+                    sign = 1.0 if digest & 0x80000000 else -1.0
+                    vectors[row, digest % self.dimension] += sign
+        return vectors
+
+
+class ChromaDefaultEmbedder(Embedder):
+    """Chroma's default embedding function (ONNX all-MiniLM-L6-v2)"""
+
+    name = "chroma-default"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+        self._function = DefaultEmbeddingFunction()
+
+    def _encode_batch(self, texts: list[str]) -> np.ndarray:
+        return np.asarray(self._function(texts), dtype=np.float32)
+
+
+class SentenceTransformerEmbedder(Embedder):
+    """A sentence-transformers model (requires the sentence-transformers package)"""
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", **kwargs):
+        super().__init__(**kwargs)
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "sentence-transformers is not installed: pip install sentence-transformers"
+            ) from e
+        self._model = SentenceTransformer(model_name)
+        self.name = f"sentence-transformers/{model_name}"
+
+    def _encode_batch(self, texts: list[str]) -> np.ndarray:
+        return self._model.encode(texts, batch_size=len(texts), convert_to_numpy=True)
+
+
+def create_embedder(spec: str, batch_size: int = 64, max_workers: int = 1) -> Embedder:
+    """
+    Build an embedder from its config name.
+
+    Args:
+        spec: "hashing", "chroma-default" or "sentence-transformers/<model>"
+        batch_size: Texts per batch
+        max_workers: Encoding threads
+
+    Returns:
+        Embedder instance
+    """
+    options = {"batch_size": batch_size, "max_workers": max_workers}
+    if spec == "hashing":
+        return HashingEmbedder(**options)
+    if spec == "chroma-default":
+        return ChromaDefaultEmbedder(**options)
+    if spec.startswith("sentence-transformers/"):
+        return SentenceTransformerEmbedder(spec.split("/", 1)[1], **options)
+    raise ValueError(f"Unknown embedding model: {spec!r}")
+
+
+class EmbedderMismatchError(ValueError):
+    """The index was built by a different embedder than the store's"""
@@ -0,0 +1,341 @@
+"""
+Document Ingestion Pipeline
+Indexes a directory tree of PDK documentation, SKILL guides and LVS notes.
+
+- Files are parsed and chunked in a process pool
+- Chunks are embedded and written in batches (embedder batch size)
+- A manifest keeps each file's hash, mtime, size and chunk IDs, so a
+  re-run only re-parses changed files and deletes the chunks of files
+  that disappeared
+
+Rules in .txt files (a rule header followed by Layer/Value fields) are
+chunked one rule per chunk with the document loader. Everything else,
+including text between rules and whole free-text files, is chunked by
+paragraphs and Markdown headings.
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    from .config import VectorStoreConfig
+    from .document_loader import RULE_HEADER_PATTERN, DocumentChunk, parse_rule
+    from .vector_store import create_vector_store
+except ImportError:
+    from config import VectorStoreConfig
+    from document_loader import RULE_HEADER_PATTERN, DocumentChunk, parse_rule
+    from vector_store import create_vector_store
+
+# Bump when chunking changes, so existing collections are re-ingested
+INGEST_VERSION = 2
+
+DEFAULT_PATTERNS = ("*.txt", "*.md", "*.rst", "*.il", "*.ils", "*.skill")
+
+# File suffix -> document type stored in the chunk metadata
+DOC_TYPES = {".md": "markdown", ".rst": "text", ".txt": "text", ".il": "skill", ".ils": "skill", ".skill": "skill"}
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_text(text: str, max_chars: int = 1500) -> list[tuple[str, str]]:
+    """
+    Split free text into chunks of whole paragraphs.
+
+    A Markdown heading starts a new chunk and becomes its title;
+    paragraphs are merged until a chunk would exceed max_chars.
+
+    Returns:
+        List of (title, chunk text); title is "" before the first heading
+    """
+    chunks, paragraphs, title, size = [], [], "", 0
+
+    def flush():
+        if paragraphs:
+            chunks.append((title, "\n\n".join(paragraphs)))
+
+    for paragraph in (p.strip() for p in text.split("\n\n")):
+        if not paragraph:
+            continue
+        if paragraph.startswith("#"):
+            flush()
+            paragraphs, size = [], 0
+            title = paragraph.splitlines()[0].lstrip("#").strip()
+        elif size + len(paragraph) > max_chars and paragraphs:
+            flush()
+            paragraphs, size = [], 0
+        paragraphs.append(paragraph)
+        size += len(paragraph)
+    flush()
+    return chunks
+
+
+def split_rules(text: str) -> list[tuple[str, DocumentChunk | None]]:
+    """
+    Split DRM-style text into rule sections and the text around them.
+
+    Sections end at a "---" separator, a "===" banner or the next rule
+    header, as in document_loader.iter_design_rules. A section counts as
+    a rule only if it has a Layer or Value field; a header-like line in
+    free text ("1.1 - Overview") does not make a rule.
+
+    Returns:
+        (text, rule) pairs in file order; rule is None for free text
+    """
+    sections, lines = [], []
+
+    def flush():
+        section = "\n".join(lines).strip()
+        if section:
+            rule = parse_rule(section)
+            is_rule = rule is not None and (rule.metadata["layer"] != "N/A" or rule.metadata["value"] != "N/A")
+            sections.append((section, rule if is_rule else None))
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped == "---" or stripped.startswith("==="):
+            flush()
+            lines = []
+            continue
+        if RULE_HEADER_PATTERN.match(stripped) and any(l.strip() for l in lines):
+            flush()
+            lines = []
+        lines.append(line)
+    flush()
+    return sections
+
+
+def chunk_file(path: str, root: str, max_chars: int = 1500) -> list[DocumentChunk]:
+    """
+    Parse and chunk one file (runs in a worker process).
+
+    Args:
+        path: File to chunk
+        root: Ingestion root, for the relative path used in chunk IDs
+        max_chars: Target chunk size for free text
+
+    Returns:
+        Chunks with chunk_id, source_file and doc_type metadata
+    """
+    relative = Path(path).relative_to(root).as_posix()
+    text = Path(path).read_text(encoding="utf-8", errors="replace")
+    doc_type = DOC_TYPES.get(Path(path).suffix.lower(), "text")
+
+    # Runs of free text between rules are chunked together
+    sections = split_rules(text) if path.endswith(".txt") else []
+    if not any(rule for _, rule in sections):
+        sections = [(text, None)]
+
+    chunks, free_text, text_chunks = [], [], 0
+
+    def flush_text():
+        nonlocal text_chunks
+        for title, chunk in chunk_text("\n\n".join(free_text), max_chars):
+            chunks.append(DocumentChunk(
+                text=chunk,
+                metadata={
+                    "chunk_id": f"{relative}#{text_chunks}",
+                    "source_file": relative,
+                    "doc_type": doc_type,
+                    "title": title or Path(path).stem,
+                    "source": "docs"
+                }
+            ))
+            text_chunks += 1
+        free_text.clear()
+
+    for section, rule in sections:
+        if rule is None:
+            free_text.append(section)
+            continue
+        flush_text()
+        rule.metadata.update(
+            chunk_id=f"{relative}::{rule.metadata['rule_id']}",
+            source_file=relative,
+            doc_type="drm"
+        )
+        chunks.append(rule)
+    flush_text()
+    return chunks
+
+
+def _chunk_file_task(args: tuple[str, str, int]) -> list[DocumentChunk]:
+    return chunk_file(*args)
+
+
+class IngestManifest:
+    """
+    Per-file ingestion state: {relative path: {sha256, mtime, size, chunk_ids}}.
+
+    Stored next to the index manifest; in memory only for in-memory stores.
+    """
+
+    def __init__(self, config: VectorStoreConfig, collection_name: str):
+        self.path = config.index_dir / f"ingest_{collection_name}.json" if config.persistent else None
+        self.files: dict[str, dict] = {}
+        if self.path and self.path.exists():
+            try:
+                data = json.loads(self.path.read_text())
+                self.files = data.get("files", {})
+            except (OSError, ValueError):
+                data, self.files = {}, {}  # Unreadable: everything is re-ingested
+            if data.get("version") != INGEST_VERSION:
+                # Chunked by older code: re-chunk every file; its old chunk IDs are still deleted
+                for entry in self.files.values():
+                    entry.update(sha256=None, mtime=None)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"version": INGEST_VERSION, "files": self.files}, indent=2))
+        os.replace(tmp_path, self.path)
+
+
+class IngestionPipeline:
+    """Incremental, parallel ingestion of a documentation tree into one collection"""
+
+    def __init__(
+        self,
+        root: str,
+        store=None,
+        config: VectorStoreConfig = None,
+        collection_name: str = None,
+        patterns: tuple[str, ...] = DEFAULT_PATTERNS,
+        max_workers: int = None,
+        max_chars: int = 1500
+    ):
+        """
+        Args:
+            root: Documentation directory (searched recursively)
+            store: Vector store to write to (default: built from config)
+            config: Store settings used when no store is given
+            collection_name: Collection for the documents (default: <config collection>_docs)
+            patterns: Glob patterns of files to ingest
+            max_workers: Parser processes (default: CPU count; 1 = parse in this process)
+            max_chars: Target chunk size for free text
+        """
+        self.root = Path(root).expanduser().resolve()
+        config = config or VectorStoreConfig()
+        self.store = store or create_vector_store(
+            config, collection_name=collection_name or f"{config.collection_name}_docs"
+        )
+        self.patterns = patterns
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_chars = max_chars
+        self.manifest = IngestManifest(self.store.config, self.store.collection_name)
+
+    def discover(self) -> list[Path]:
+        """Files under root matching the patterns (sorted, no duplicates)"""
+        files = {path for pattern in self.patterns for path in self.root.rglob(pattern) if path.is_file()}
+        return sorted(files)
+
+    def run(self) -> dict:
+        """
+        Bring the collection in line with the documentation tree.
+
+        Returns:
+            dict with file and chunk counts and the elapsed time
+        """
+        started = time.perf_counter()
+
+        # Index built by another embedder, or wiped: start from scratch
+        info = self.store.get_index_info()
+        if info.get("embedding_model") not in (None, self.store.embedder.name) or self.store.count() == 0:
+            if self.store.count():
+                self.store.clear()
+            self.manifest.files = {}
+
+        # 1. Change detection: mtime + size first, content hash only if they differ
+        current, changed = {}, []
+        for path in self.discover():
+            relative = path.relative_to(self.root).as_posix()
+            stat = path.stat()
+            entry = self.manifest.files.get(relative)
+            if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                current[relative] = entry
+                continue
+            digest = file_digest(path)
+            if entry and entry["sha256"] == digest:
+                current[relative] = {**entry, "mtime": stat.st_mtime, "size": stat.st_size}
+                continue
+            current[relative] = {"sha256": digest, "mtime": stat.st_mtime, "size": stat.st_size, "chunk_ids": []}
+            changed.append(relative)
+
+        # 2. Parse and chunk changed files in parallel
+        tasks = [(str(self.root / relative), str(self.root), self.max_chars) for relative in changed]
+        if self.max_workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as pool:
+                parsed = list(pool.map(_chunk_file_task, tasks, chunksize=max(1, len(tasks) // (4 * self.max_workers))))
+        else:
+            parsed = [_chunk_file_task(task) for task in tasks]
+
+        # 3. Write: upsert new/changed chunks (batched embedding), delete chunks that went away
+        stale_ids = []
+        new_chunks = []
+        for relative, chunks in zip(changed, parsed):
+            chunk_ids = [chunk.metadata["chunk_id"] for chunk in chunks]
+            old_ids = set(self.manifest.files.get(relative, {}).get("chunk_ids", []))
+            stale_ids.extend(old_ids - set(chunk_ids))
+            current[relative]["chunk_ids"] = chunk_ids
+            new_chunks.extend(chunks)
+
+        removed_files = [relative for relative in self.manifest.files if relative not in current]
+        for relative in removed_files:
+            stale_ids.extend(self.manifest.files[relative].get("chunk_ids", []))
+
+        upserted = self.store.upsert_documents(new_chunks)
+        removed_chunks = self.store.delete_documents(stale_ids)
+
+        self.manifest.files = current
+        self.manifest.save()
+        self.store.record_index_info(source_path=str(self.root), files=len(current))
+
+        return {
+            "files_scanned": len(current),
+            "files_changed": len(changed),
+            "files_unchanged": len(current) - len(changed),
+            "files_removed": len(removed_files),
+            "chunks_added": upserted["added"],
+            "chunks_updated": upserted["updated"],
+            "chunks_unchanged": upserted["unchanged"],
+            "chunks_removed": removed_chunks,
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+
+    def retriever(self, **kwargs):
+        """
+        Retriever over the ingested collection (call its refresh() after later runs).
+
+        Args:
+            **kwargs: DesignRuleRetriever options (search_mode, caches, ...)
+        """
+        try:
+            from .retriever import DesignRuleRetriever
+        except ImportError:
+            from retriever import DesignRuleRetriever
+        return DesignRuleRetriever(store=self.store, sync_source=False, **kwargs)
+
+
+# Ingest a documentation tree from the command line
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Index a documentation tree for the EDA Copilot")
+    parser.add_argument("root", help="Documentation directory")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes")
+    args = parser.parse_args()
+
+    stats = IngestionPipeline(args.root, max_workers=args.workers).run()
+    print(json.dumps(stats, indent=2))
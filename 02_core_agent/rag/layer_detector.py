@@ -0,0 +1,122 @@
+"""
+Layer Detector
+Infers which layer a question is about, to search only that partition.
+
+Matches layer names as written in the DRM ("Metal1", "Poly"), rule-ID
+prefixes ("M1", "VIA1"), numbered shorthands ("metal 2", "v1") and a few
+synonyms ("gate" -> Poly, "diffusion" -> Active). Only layers present in
+the index are returned. A question naming several layers is ambiguous
+and gets a low confidence, so the caller falls back to a global search.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+try:
+    from .document_loader import DocumentChunk
+    from .rule_index import parse_rule_id
+except ImportError:
+    from document_loader import DocumentChunk
+    from rule_index import parse_rule_id
+
+# Extra names per layer (lowercase layer name -> aliases)
+LAYER_SYNONYMS = {
+    "poly": ["polysilicon", "gate"],
+    "active": ["diffusion", "diff", "od"],
+    "contact": ["cont"],
+    "nwell": ["n-well", "n well"],
+}
+
+# Synonyms are weaker evidence than a layer name or rule ID ("gate" may be about Poly or not)
+EXPLICIT_CONFIDENCE = 1.0
+SYNONYM_CONFIDENCE = 0.7
+
+
+@dataclass
+class LayerGuess:
+    """Result of layer detection"""
+    layer: str | None
+    confidence: float
+    matches: list[str] = field(default_factory=list)  # Alias strings found in the question
+
+
+class LayerDetector:
+    """Alias-based layer detection for the layers of one index"""
+
+    def __init__(self, layers: list[str], prefixes: dict[str, str] = None):
+        """
+        Args:
+            layers: Layer names as they appear in the rule metadata
+            prefixes: Rule-ID prefix -> layer (e.g. {"M1": "Metal1"})
+        """
+        self.layers = sorted(set(layers))
+        # alias -> (layer, confidence)
+        self.aliases: dict[str, tuple[str, float]] = {}
+
+        for layer in self.layers:
+            name = layer.lower()
+            self._add(name, layer, EXPLICIT_CONFIDENCE)
+            # Numbered layers: "Metal1" -> "metal 1", "m1", "met1"; "VIA1" -> "via 1", "v1"
+            numbered = re.fullmatch(r"(metal|via)(\d+)", name)
+            if numbered:
+                kind, number = numbered.groups()
+                self._add(f"{kind} {number}", layer, EXPLICIT_CONFIDENCE)
+                self._add(f"{kind[0]}{number}", layer, EXPLICIT_CONFIDENCE)
+                if kind == "metal":
+                    self._add(f"met{number}", layer, EXPLICIT_CONFIDENCE)
+            for synonym in LAYER_SYNONYMS.get(name, []):
+                self._add(synonym, layer, SYNONYM_CONFIDENCE)
+
+        for prefix, layer in (prefixes or {}).items():
+            self._add(prefix.lower(), layer, EXPLICIT_CONFIDENCE)
+
+        # Longest alias first, so "metal 1" wins over "m1"-style fragments
+        alternatives = sorted(self.aliases, key=len, reverse=True)
+        self._pattern = re.compile(
+            r"(?<![a-z0-9])(" + "|".join(re.escape(a) for a in alternatives) + r")(?![a-z0-9])"
+        ) if alternatives else None
+
+    @classmethod
+    def from_chunks(cls, chunks: list[DocumentChunk]) -> "LayerDetector":
+        """Build a detector from the layers and rule-ID prefixes of indexed chunks"""
+        layers, prefixes = [], {}
+        for chunk in chunks:
+            layer = chunk.metadata.get("layer")
+            if not layer or layer == "N/A":
+                continue
+            layers.append(layer)
+            prefix = parse_rule_id(chunk.metadata.get("rule_id", ""))[0]
+            if prefix:
+                prefixes.setdefault(prefix, layer)
+        return cls(layers, prefixes)
+
+    def _add(self, alias: str, layer: str, confidence: float) -> None:
+        # An explicit alias of one layer beats a synonym of another
+        current = self.aliases.get(alias)
+        if current is None or current[1] < confidence:
+            self.aliases[alias] = (layer, confidence)
+
+    def detect(self, question: str) -> LayerGuess:
+        """
+        Guess the layer a question is about.
+
+        Args:
+            question: Natural language question
+
+        Returns:
+            LayerGuess; layer is None if no layer is mentioned. Questions
+            naming several layers get confidence 1 / number of layers.
+        """
+        if self._pattern is None:
+            return LayerGuess(None, 0.0)
+
+        matches = self._pattern.findall(question.lower())
+        found: dict[str, float] = {}
+        for alias in matches:
+            layer, confidence = self.aliases[alias]
+            found[layer] = max(found.get(layer, 0.0), confidence)
+
+        if not found:
+            return LayerGuess(None, 0.0, matches)
+        layer, confidence = max(found.items(), key=lambda item: item[1])
+        return LayerGuess(layer, confidence / len(found), matches)
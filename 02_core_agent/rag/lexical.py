@@ -0,0 +1,138 @@
+"""
+Lexical Retrieval (BM25)
+In-process inverted index over chunk text and metadata.
+
+Embeddings are good at meaning but weak at exact tokens: "M1.S.2",
+"V0" or "27nm" often rank wrong. BM25 scores exact token overlap, and
+reciprocal rank fusion (RRF) combines both rankings.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+
+try:
+    from .document_loader import DocumentChunk
+except ImportError:
+    from document_loader import DocumentChunk
+
+# Words, numbers with units (27nm) and dotted identifiers (m1.s.2) as single tokens
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:\.[a-z0-9]+)*")
+
+# Metadata fields indexed along with the text
+INDEXED_METADATA = ("rule_id", "layer")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lowercase tokens; dotted identifiers also yield their parts.
+
+    "M1.S.2 spacing" -> ["m1.s.2", "m1", "s", "2", "spacing"]
+    """
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(token)
+        if "." in token and not token.replace(".", "").isdigit():
+            tokens.extend(token.split("."))
+    return tokens
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of chunks"""
+
+    def __init__(self, chunks: list[DocumentChunk], k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            chunks: Documents to index
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+
+        # token -> [(doc index, term frequency)]
+        self.postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self.doc_lengths: list[int] = []
+
+        for i, chunk in enumerate(chunks):
+            fields = [chunk.text] + [str(chunk.metadata.get(key, "")) for key in INDEXED_METADATA]
+            counts = Counter(tokenize(" ".join(fields)))
+            self.doc_lengths.append(sum(counts.values()))
+            for token, tf in counts.items():
+                self.postings[token].append((i, tf))
+
+        self.avg_length = sum(self.doc_lengths) / len(self.doc_lengths) if self.doc_lengths else 0.0
+
+    def idf(self, token: str) -> float:
+        """BM25 inverse document frequency (always positive)"""
+        n = len(self.postings.get(token, ()))
+        return math.log(1 + (len(self.chunks) - n + 0.5) / (n + 0.5))
+
+    def search(self, query: str, n_results: int = 3, layer_filter: str = None) -> list[dict]:
+        """
+        Rank chunks by BM25 score.
+
+        Args:
+            query: Query text
+            n_results: Number of results to return
+            layer_filter: Optional exact layer metadata filter
+
+        Returns:
+            List of results with text, metadata and score (highest first)
+        """
+        scores: dict[int, float] = defaultdict(float)
+        for token in set(tokenize(query)):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            idf = self.idf(token)
+            for i, tf in postings:
+                norm = 1 - self.b + self.b * self.doc_lengths[i] / self.avg_length
+                scores[i] += idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+
+        if layer_filter:
+            scores = {i: s for i, s in scores.items() if self.chunks[i].metadata.get("layer") == layer_filter}
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:n_results]
+        return [
+            {"text": self.chunks[i].text, "metadata": self.chunks[i].metadata, "score": score}
+            for i, score in ranked
+        ]
+
+
+def reciprocal_rank_fusion(
+    result_lists: list[list[dict]],
+    weights: list[float],
+    n_results: int,
+    k: int = 60
+) -> list[dict]:
+    """
+    Merge several rankings with weighted reciprocal rank fusion.
+
+    Each result earns weight / (k + rank) from every list it appears in;
+    only ranks matter, so BM25 scores and vector distances need no
+    common scale. Results are identified by their rule_id.
+
+    Args:
+        result_lists: Rankings to merge (best first)
+        weights: One weight per ranking
+        n_results: Number of fused results to return
+        k: RRF damping constant (60 in the original paper)
+
+    Returns:
+        Fused results with an added "rrf_score", best first
+    """
+    fused: dict[str, dict] = {}
+    for results, weight in zip(result_lists, weights):
+        if weight <= 0:
+            continue
+        for rank, result in enumerate(results, start=1):
+            key = result["metadata"].get("rule_id") or result["text"]
+            entry = fused.setdefault(key, {**result, "rrf_score": 0.0})
+            # Keep the vector distance if any list has one
+            if entry.get("distance") is None and result.get("distance") is not None:
+                entry["distance"] = result["distance"]
+            entry["rrf_score"] += weight / (k + rank)
+
+    return sorted(fused.values(), key=lambda r: r["rrf_score"], reverse=True)[:n_results]
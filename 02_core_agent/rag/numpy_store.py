@@ -0,0 +1,555 @@
+"""
+NumPy Vector Store
+Brute-force similarity search over a memory-mapped embedding matrix.
+
+For a few thousand rule chunks per PDK, one matrix-vector product is
+cheaper than Chroma's startup and per-query overhead. Embeddings are
+L2-normalized and stored as a float32/float16 .npy file that is opened
+with mmap, so loading takes milliseconds and every worker process
+shares the same pages through the OS page cache.
+
+Rows are stored grouped by layer, so each layer is a contiguous slice
+of the matrix: a layer-filtered search scans only that partition.
+
+Layout in <index_dir>/numpy/<collection_name>/:
+    CURRENT                      name of the live generation directory
+    gen-NNNNNN/embeddings.npy    normalized embeddings, one row per chunk (grouped by layer)
+    gen-NNNNNN/documents.json    ids, texts and metadata, in row order
+
+Every save writes a new generation directory and then swaps the CURRENT
+pointer, so a reader never pairs the embeddings of one save with the
+documents of another.
+"""
+
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+try:
+    from .config import IndexManifest, VectorStoreConfig
+    from .document_loader import DocumentChunk
+    from .embeddings import Embedder, EmbedderMismatchError, create_embedder
+    from .vector_store import chunk_hash, document_id
+except ImportError:
+    from config import IndexManifest, VectorStoreConfig
+    from document_loader import DocumentChunk
+    from embeddings import Embedder, EmbedderMismatchError, create_embedder
+    from vector_store import chunk_hash, document_id
+
+CURRENT_FILE = "CURRENT"
+EMBEDDINGS_FILE = "embeddings.npy"
+DOCUMENTS_FILE = "documents.json"
+
+# Rows upcast to float32 per block when the matrix is stored as float16
+SCORE_BLOCK_ROWS = 2048
+
+
+def current_generation(root: Path) -> int:
+    """Generation the CURRENT pointer refers to (0 if nothing was published)"""
+    try:
+        return int((Path(root) / CURRENT_FILE).read_text().strip().split("-")[-1])
+    except (OSError, ValueError):
+        return 0
+
+
+def generation_dir(generation: int) -> str:
+    return f"gen-{generation:06d}"
+
+
+def publish_generation(root: Path, tmp_dir: Path, generation: int, keep: int = 2) -> None:
+    """
+    Make a fully written generation directory the live one.
+
+    Args:
+        root: Directory holding the generations and the CURRENT pointer
+        tmp_dir: Complete generation, written under a temporary name
+        generation: Number of the new generation
+        keep: Generations kept for readers still using them
+    """
+    os.replace(tmp_dir, root / generation_dir(generation))
+
+    # Atomic swap: readers see either the old or the new pointer
+    tmp_pointer = root / (CURRENT_FILE + ".tmp")
+    tmp_pointer.write_text(generation_dir(generation))
+    os.replace(tmp_pointer, root / CURRENT_FILE)
+
+    # Readers that still map a removed generation keep working (POSIX unlink semantics)
+    for path in root.glob("gen-*"):
+        try:
+            number = int(path.name.split("-")[-1])
+        except ValueError:
+            continue
+        if number <= generation - keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def partition_rows(layers: list[str]) -> dict[str, slice | np.ndarray]:
+    """Layer -> rows of that layer (a slice when contiguous, else an index array)"""
+    layers = np.array(layers, dtype=object)
+    partitions = {}
+    for layer in dict.fromkeys(layers):
+        rows = np.flatnonzero(layers == layer)
+        contiguous = rows[-1] - rows[0] + 1 == len(rows)
+        partitions[layer] = slice(rows[0], rows[-1] + 1) if contiguous else rows
+    return partitions
+
+
+def top_k_rows(
+    embeddings: np.ndarray,
+    query_embeddings: np.ndarray,
+    n_results: int,
+    part: slice | np.ndarray = None
+) -> list[list[tuple[int, float]]]:
+    """
+    Brute-force top-k cosine search of normalized vectors.
+
+    Args:
+        embeddings: (rows x dim) normalized matrix (may be memory-mapped)
+        query_embeddings: (queries x dim) normalized query vectors
+        n_results: k
+        part: Rows to search (default: all); a slice scans a view, no copy
+
+    Returns:
+        Per query, [(row, distance)] best first, distance = 1 - cosine similarity
+    """
+    candidates = np.arange(len(embeddings))
+    matrix = embeddings
+    if part is not None:
+        candidates = candidates[part]
+        matrix = embeddings[part]
+    if len(candidates) == 0 or n_results <= 0:
+        return [[] for _ in range(len(query_embeddings))]
+
+    # (candidates x queries) similarity matrix, always computed in float32:
+    # NumPy has no BLAS path for float16, so float16 is a storage format only
+    queries = np.asarray(query_embeddings, dtype=np.float32)
+    if matrix.dtype == np.float32:
+        scores = matrix @ queries.T
+    else:
+        scores = np.empty((len(candidates), len(queries)), dtype=np.float32)
+        for start in range(0, len(candidates), SCORE_BLOCK_ROWS):
+            block = np.asarray(matrix[start:start + SCORE_BLOCK_ROWS], dtype=np.float32)
+            scores[start:start + SCORE_BLOCK_ROWS] = block @ queries.T
+
+    # Top-k per query without sorting whole columns
+    k = min(n_results, len(candidates))
+    if k < len(candidates):
+        top = np.argpartition(-scores, k - 1, axis=0)[:k]
+    else:
+        top = np.tile(np.arange(len(candidates))[:, None], (1, len(queries)))
+
+    results = []
+    for column in range(len(queries)):
+        rows = top[:, column]
+        rows = rows[np.argsort(-scores[rows, column])]
+        results.append([(int(candidates[i]), float(1.0 - scores[i, column])) for i in rows])
+    return results
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """One consistent view of the index; replaced as a whole, never modified"""
+    ids: list[str]
+    texts: list[str]
+    metadatas: list[dict]
+    embeddings: np.ndarray
+    partitions: dict[str, slice | np.ndarray]
+
+
+class NumpyVectorStore:
+    """Drop-in alternative to VectorStore backed by a NumPy matrix"""
+
+    # Distances are 1 - cosine similarity (see top_k_rows)
+    distance_metric = "cosine"
+
+    def __init__(self, collection_name: str = None, config: VectorStoreConfig = None, embedder: Embedder = None):
+        """
+        Initialize the store, mapping an existing index if there is one.
+
+        Args:
+            collection_name: Index name (default: derived from config)
+            config: Store settings (backend="numpy"; dtype picks float32/float16)
+            embedder: Embedder to use (default: built from config.embedding_model)
+        """
+        self.config = config or VectorStoreConfig(backend="numpy")
+        self.collection_name = collection_name or self.config.collection_name
+        self.manifest = IndexManifest(self.config)
+        self.embedder = embedder or create_embedder(
+            self.config.embedding_model,
+            batch_size=self.config.embedding_batch_size,
+            max_workers=self.config.embedding_workers
+        )
+        self._index_embedder = self.get_index_info().get("embedding_model")
+        self.dtype = np.dtype(self.config.dtype)
+        self.path = self.config.index_dir / "numpy" / self.collection_name if self.config.persistent else None
+
+        self._load()
+
+    def _load(self) -> None:
+        """Map the current generation read-only, or start empty"""
+        documents, embeddings = None, None
+        if self.path is not None:
+            generation = current_generation(self.path)
+            try:
+                if generation:
+                    directory = self.path / generation_dir(generation)
+                    documents = json.loads((directory / DOCUMENTS_FILE).read_text())
+                    embeddings = np.load(directory / EMBEDDINGS_FILE, mmap_mode="r")
+                elif (self.path / DOCUMENTS_FILE).exists():
+                    # Index saved before generations were introduced
+                    documents = json.loads((self.path / DOCUMENTS_FILE).read_text())
+                    embeddings = np.load(self.path / EMBEDDINGS_FILE, mmap_mode="r")
+            except (OSError, ValueError):
+                documents, embeddings = None, None  # Generation removed under us or unreadable
+            if documents is not None and (len(embeddings) != len(documents["ids"]) or embeddings.dtype != self.dtype):
+                # Other dtype (or a legacy interrupted write): treat as empty, the next sync rebuilds it
+                documents, embeddings = None, None
+
+        if documents is None:
+            self._publish([], [], [], np.zeros((0, 0), dtype=self.dtype))
+        else:
+            self._publish(documents["ids"], documents["texts"], documents["metadatas"], embeddings)
+
+    def _publish(self, ids: list[str], texts: list[str], metadatas: list[dict], embeddings: np.ndarray) -> None:
+        # Single reference assignment: searches running on other threads
+        # see either the old or the new index, never a mix of both
+        self._snapshot = _Snapshot(
+            ids, texts, metadatas, embeddings,
+            partition_rows([m.get("layer", "") for m in metadatas])
+        )
+
+    @property
+    def ids(self) -> list[str]:
+        return self._snapshot.ids
+
+    @property
+    def texts(self) -> list[str]:
+        return self._snapshot.texts
+
+    @property
+    def metadatas(self) -> list[dict]:
+        return self._snapshot.metadatas
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        return self._snapshot.embeddings
+
+    def layer_sizes(self) -> dict[str, int]:
+        """Number of rows per layer partition"""
+        return {
+            layer: part.stop - part.start if isinstance(part, slice) else len(part)
+            for layer, part in self._snapshot.partitions.items()
+        }
+
+    def _check_embedder(self) -> None:
+        """Refuse to mix vectors of two embedders in one index"""
+        if self._index_embedder and self._index_embedder != self.embedder.name and self.count() > 0:
+            raise EmbedderMismatchError(
+                f"Index {self.collection_name} was built with {self._index_embedder}, "
+                f"not {self.embedder.name}; rebuild() it first"
+            )
+
+    def _save(self, ids: list[str], texts: list[str], metadatas: list[dict], embeddings: np.ndarray) -> None:
+        """Replace the stored index (write a new generation, then swap the pointer)"""
+        # Group rows by layer (stable), so every layer partition is one slice
+        order = sorted(range(len(ids)), key=lambda i: metadatas[i].get("layer", ""))
+        if order != list(range(len(ids))):
+            ids = [ids[i] for i in order]
+            texts = [texts[i] for i in order]
+            metadatas = [metadatas[i] for i in order]
+            embeddings = embeddings[order]
+        embeddings = embeddings.astype(self.dtype, copy=False)
+        if ids and self._index_embedder != self.embedder.name:
+            self.manifest.update(self.collection_name, embedding_model=self.embedder.name)
+            self._index_embedder = self.embedder.name
+        if self.path is None:
+            self._publish(ids, texts, metadatas, embeddings)
+            return
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        generation = current_generation(self.path) + 1
+        tmp_dir = self.path / f".{generation_dir(generation)}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir()
+        np.save(tmp_dir / EMBEDDINGS_FILE, embeddings)
+        (tmp_dir / DOCUMENTS_FILE).write_text(json.dumps({"ids": ids, "texts": texts, "metadatas": metadatas}))
+        publish_generation(self.path, tmp_dir, generation)
+        self._load()
+
+    def add_documents(self, chunks: list[DocumentChunk]) -> None:
+        """
+        Add document chunks to the store.
+
+        Args:
+            chunks: List of DocumentChunk objects to add
+        """
+        if not chunks:
+            return
+        self._check_embedder()
+        new_embeddings = self.embedder.embed([chunk.text for chunk in chunks])
+        old_embeddings = np.asarray(self.embeddings, dtype=np.float32).reshape(len(self.ids), -1)
+        self._save(
+            self.ids + [document_id(chunk) for chunk in chunks],
+            self.texts + [chunk.text for chunk in chunks],
+            self.metadatas + [
+                {**chunk.metadata, "content_hash": chunk_hash(chunk)} for chunk in chunks
+            ],
+            np.vstack([old_embeddings, new_embeddings]) if len(old_embeddings) else new_embeddings
+        )
+
+    def sync_documents(self, chunks: Iterable[DocumentChunk]) -> dict:
+        """
+        Bring the index in line with chunks, embedding only new or changed ones.
+
+        Changed chunks are embedded one batch at a time as they arrive,
+        so a streaming loader overlaps parsing and embedding.
+
+        Args:
+            chunks: Complete, current chunks for this collection (list or generator)
+
+        Returns:
+            dict with counts of added, updated, removed and unchanged chunks
+        """
+        self._check_embedder()
+        rows = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        stored_hashes = {doc_id: self.metadatas[i].get("content_hash") for doc_id, i in rows.items()}
+
+        ids, texts, metadatas = [], [], []
+        reused_rows, to_embed, pending = [], [], []
+        new_vectors = []
+        added = updated = 0
+        for chunk in chunks:
+            doc_id = document_id(chunk)
+            digest = chunk_hash(chunk)
+            ids.append(doc_id)
+            texts.append(chunk.text)
+            metadatas.append({**chunk.metadata, "content_hash": digest})
+            if stored_hashes.get(doc_id) == digest:
+                reused_rows.append((len(ids) - 1, rows[doc_id]))
+                continue
+            if doc_id in stored_hashes:
+                updated += 1
+            else:
+                added += 1
+            to_embed.append(len(ids) - 1)
+            pending.append(chunk.text)
+            if len(pending) >= self.embedder.batch_size:
+                new_vectors.append(self.embedder.embed(pending))
+                pending = []
+        if pending:
+            new_vectors.append(self.embedder.embed(pending))
+
+        current_ids = set(ids)
+        removed = sum(1 for doc_id in self.ids if doc_id not in current_ids)
+        if not to_embed and not removed:
+            return {"added": 0, "updated": 0, "removed": 0, "unchanged": len(ids)}
+
+        embeddings = None
+        if to_embed:
+            new_vectors = np.vstack(new_vectors)
+            embeddings = np.zeros((len(ids), new_vectors.shape[1]), dtype=np.float32)
+            embeddings[to_embed] = new_vectors
+        if reused_rows:
+            if embeddings is None:
+                embeddings = np.zeros((len(ids), self.embeddings.shape[1]), dtype=np.float32)
+            target, source = zip(*reused_rows)
+            embeddings[list(target)] = self.embeddings[list(source)]
+        if embeddings is None:
+            embeddings = np.zeros((0, 0), dtype=np.float32)
+
+        self._save(ids, texts, metadatas, embeddings)
+        return {
+            "added": added,
+            "updated": updated,
+            "removed": removed,
+            "unchanged": len(ids) - added - updated
+        }
+
+    def upsert_documents(self, chunks: Iterable[DocumentChunk]) -> dict:
+        """
+        Add or update chunks without touching the rest of the index.
+
+        Args:
+            chunks: Chunks to write
+
+        Returns:
+            dict with counts of added, updated and unchanged chunks
+        """
+        self._check_embedder()
+        rows = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        ids, texts, metadatas = list(self.ids), list(self.texts), list(self.metadatas)
+
+        to_embed, pending, new_vectors = [], [], []
+        added = updated = total = 0
+        for chunk in chunks:
+            total += 1
+            doc_id = document_id(chunk)
+            digest = chunk_hash(chunk)
+            row = rows.get(doc_id)
+            if row is not None and metadatas[row].get("content_hash") == digest:
+                continue
+            if row is None:
+                row = rows[doc_id] = len(ids)
+                ids.append(doc_id)
+                texts.append(chunk.text)
+                metadatas.append({})
+                added += 1
+            else:
+                updated += 1
+            texts[row] = chunk.text
+            metadatas[row] = {**chunk.metadata, "content_hash": digest}
+            to_embed.append(row)
+            pending.append(chunk.text)
+            if len(pending) >= self.embedder.batch_size:
+                new_vectors.append(self.embedder.embed(pending))
+                pending = []
+        if pending:
+            new_vectors.append(self.embedder.embed(pending))
+
+        if to_embed:
+            new_vectors = np.vstack(new_vectors)
+            embeddings = np.zeros((len(ids), new_vectors.shape[1]), dtype=np.float32)
+            if len(self.ids):
+                embeddings[:len(self.ids)] = self.embeddings
+            embeddings[to_embed] = new_vectors
+            self._save(ids, texts, metadatas, embeddings)
+
+        return {"added": added, "updated": updated, "unchanged": total - added - updated}
+
+    def delete_documents(self, ids: list[str]) -> int:
+        """Delete chunks by ID; returns the number of chunks removed"""
+        remove = set(ids)
+        keep = [i for i, doc_id in enumerate(self.ids) if doc_id not in remove]
+        removed = len(self.ids) - len(keep)
+        if removed:
+            embeddings = np.asarray(self.embeddings, dtype=np.float32)[keep] if keep else np.zeros((0, 0), np.float32)
+            self._save(
+                [self.ids[i] for i in keep],
+                [self.texts[i] for i in keep],
+                [self.metadatas[i] for i in keep],
+                embeddings
+            )
+        return removed
+
+    def get_documents(self) -> list[DocumentChunk]:
+        """All stored chunks (text and metadata, no embeddings)"""
+        snapshot = self._snapshot
+        return [
+            DocumentChunk(text=text, metadata=dict(metadata))
+            for text, metadata in zip(snapshot.texts, snapshot.metadatas)
+        ]
+
+    def count(self) -> int:
+        """Number of documents in the index"""
+        return len(self.ids)
+
+    def get_index_info(self) -> dict:
+        """Manifest entry of this collection (source hash, embedding model, ...)"""
+        return self.manifest.get(self.collection_name)
+
+    def record_index_info(self, **values) -> None:
+        """Record what the index was built from in the index manifest"""
+        self.manifest.update(
+            self.collection_name,
+            embedding_model=self.embedder.name,
+            documents=self.count(),
+            backend="numpy",
+            dtype=self.config.dtype,
+            **values
+        )
+        self._index_embedder = self.embedder.name
+
+    def is_current(self, source_hash: str) -> bool:
+        """Whether the index was built from this source with the configured embedding model"""
+        info = self.get_index_info()
+        return (
+            info.get("source_hash") == source_hash
+            and info.get("embedding_model") == self.embedder.name
+            and self.count() > 0
+        )
+
+    def search(
+        self,
+        query: str,
+        n_results: int = 3,
+        layer_filter: str = None,
+        query_embedding: np.ndarray = None
+    ) -> list[dict]:
+        """
+        Search for similar documents.
+
+        Args:
+            query: Natural language query
+            n_results: Number of results to return
+            layer_filter: Optional filter by layer (e.g., "Metal1")
+            query_embedding: Precomputed embedding of query (e.g. from a cache)
+
+        Returns:
+            List of results with text, metadata, and distance (1 - cosine similarity)
+        """
+        embeddings = None if query_embedding is None else np.asarray(query_embedding)[None, :]
+        return self.search_many([query], n_results, layer_filter, query_embeddings=embeddings)[0]
+
+    def search_many(
+        self,
+        queries: list[str],
+        n_results: int = 3,
+        layer_filter: str = None,
+        query_embeddings: np.ndarray = None
+    ) -> list[list[dict]]:
+        """
+        Search for several queries with one matrix-matrix product.
+
+        Args:
+            queries: Natural language queries
+            n_results: Number of results per query
+            layer_filter: Optional filter by layer (e.g., "Metal1")
+            query_embeddings: Precomputed embeddings, one row per query
+
+        Returns:
+            One result list per query, in input order
+        """
+        if not queries:
+            return []
+        snapshot = self._snapshot  # Rows, metadata and partitions of one index version
+        if not snapshot.ids or n_results <= 0:
+            return [[] for _ in queries]
+
+        self._check_embedder()
+        if query_embeddings is None:
+            query_embeddings = self.embedder.embed(queries)
+
+        # A contiguous layer partition is a view: only its rows are scanned
+        part = snapshot.partitions.get(layer_filter, slice(0, 0)) if layer_filter else None
+        return [
+            [
+                {"text": snapshot.texts[row], "metadata": snapshot.metadatas[row], "distance": distance}
+                for row, distance in hits
+            ]
+            for hits in top_k_rows(snapshot.embeddings, query_embeddings, n_results, part)
+        ]
+
+    def export_rows(self) -> tuple[list[str], list[str], list[dict], np.ndarray]:
+        """ids, texts, metadata and the embedding matrix, in row order"""
+        snapshot = self._snapshot
+        return list(snapshot.ids), list(snapshot.texts), list(snapshot.metadatas), np.asarray(snapshot.embeddings)
+
+    def clear(self) -> None:
+        """Remove all documents from the index."""
+        if self.path is not None:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self._load()
+        else:
+            self._save([], [], [], np.zeros((0, 0), dtype=np.float32))
+        self.manifest.remove(self.collection_name)
+        self._index_embedder = None
+
+    def rebuild(self, chunks: list[DocumentChunk]) -> dict:
+        """Clear the index and embed chunks from scratch"""
+        self.clear()
+        return self.sync_documents(chunks)
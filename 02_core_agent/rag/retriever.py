@@ -3,14 +3,48 @@ Retriever for RAG System
 High-level interface for searching design rules.
 """
 
+import hashlib
+import threading
 from pathlib import Path
+from typing import Callable
+
+import numpy as np
 
 try:
-    from .document_loader import load_design_rules
-    from .vector_store import VectorStore
+    from .cache import LRUCache, normalize_query, result_size
+    from .config import VectorStoreConfig
+    from .context_packer import ContextPacker
+    from .embeddings import create_embedder
+    from .document_loader import LOADER_VERSION, iter_design_rules
+    from .layer_detector import LayerDetector
+    from .lexical import BM25Index, reciprocal_rank_fusion
+    from .rule_index import RuleIndex
+    from .shared_index import SharedIndexStore, publish_index
+    from .vector_store import VectorStore, create_vector_store
 except ImportError:
-    from document_loader import load_design_rules
-    from vector_store import VectorStore
+    from cache import LRUCache, normalize_query, result_size
+    from config import VectorStoreConfig
+    from context_packer import ContextPacker
+    from embeddings import create_embedder
+    from document_loader import LOADER_VERSION, iter_design_rules
+    from layer_detector import LayerDetector
+    from lexical import BM25Index, reciprocal_rank_fusion
+    from rule_index import RuleIndex
+    from shared_index import SharedIndexStore, publish_index
+    from vector_store import VectorStore, create_vector_store
+
+DEFAULT_DATA_PATH = Path(__file__).parent / "data" / "design_rules.txt"
+
+SEARCH_MODES = ("hybrid", "vector", "lexical")
+
+
+def file_hash(path: Path) -> str:
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
 
 class DesignRuleRetriever:
@@ -19,31 +53,360 @@ class DesignRuleRetriever:
     This is the main interface for the RAG system.
     """
 
-    def __init__(self, data_path: str = None):
+    def __init__(
+        self,
+        data_path: str = None,
+        store: VectorStore = None,
+        config: VectorStoreConfig = None,
+        search_mode: str = "hybrid",
+        vector_weight: float = 1.0,
+        lexical_weight: float = 1.0,
+        rrf_k: int = 60,
+        embedding_cache_size: int = 1024,
+        result_cache_size: int = 256,
+        cache_max_bytes: int = 8 << 20,
+        auto_layer: bool = True,
+        layer_confidence: float = 0.6,
+        sync_source: bool = True,
+        packer: ContextPacker = None
+    ):
         """
         Initialize the retriever with design rules.
 
         Args:
             data_path: Path to design_rules.txt (optional, uses default if not provided)
+            store: Vector store to use (optional, built from config otherwise)
+            config: Store settings used when no store is given
+            search_mode: "hybrid" (BM25 + vectors), "vector" or "lexical" (BM25 only)
+            vector_weight: Weight of the vector ranking in rank fusion
+            lexical_weight: Weight of the BM25 ranking in rank fusion
+            rrf_k: Reciprocal rank fusion damping constant
+            embedding_cache_size: Query embeddings kept in the LRU cache (0 = no cache)
+            result_cache_size: Search results kept in the LRU cache (0 = no cache)
+            cache_max_bytes: Approximate memory cap of each cache
+            auto_layer: Infer the layer from the question when none is given
+            layer_confidence: Minimum detector confidence to search only that layer
+            sync_source: Index data_path into the store; False when the store is
+                         filled elsewhere (e.g. by rag.ingest.IngestionPipeline)
+            packer: Formats query() context within a token budget (default: ContextPacker())
         """
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"search_mode must be one of {SEARCH_MODES}, got {search_mode!r}")
+        self.search_mode = search_mode
+        self.vector_weight = vector_weight
+        self.lexical_weight = lexical_weight
+        self.rrf_k = rrf_k
+        self.embedding_cache = LRUCache(embedding_cache_size, cache_max_bytes, sizeof=lambda v: v.nbytes + 112)
+        self.result_cache = LRUCache(result_cache_size, cache_max_bytes, sizeof=result_size)
+        self.sync_source = sync_source
+        self.auto_layer = auto_layer
+        self.layer_confidence = layer_confidence
+        self._layer_stats = {"explicit": 0, "inferred": 0, "global": 0}
+        self.packer = packer or ContextPacker()
+
         # TODO 1: Set default data path if not provided
         # Hint: Path(__file__).parent / "data" / "design_rules.txt"
-        if data_path is None:
-            data_path = Path(__file__).parent / "data" / "design_rules.txt"
-        
+        self.data_path = Path(data_path) if data_path else DEFAULT_DATA_PATH
 
         # TODO 2: Initialize vector store
-        self.store = VectorStore()
-
+        self.store = store or create_vector_store(config)
+        self._lock = threading.Lock()
+        self.lexical: BM25Index = None
+        self.rules: RuleIndex = None
+        self.layer_detector: LayerDetector = None
+        # Shared index published by this retriever, or generation attached to (see publish_shared)
+        self.shared_root: Path = None
+        self._indexed_generation = None
+        # Called after every index change (see add_change_listener)
+        self._change_listeners: list[Callable[[], None]] = []
 
         # TODO 3: Load documents and add to vector store
-        # Hint: chunks = load_design_rules(data_path)
-        # Hint: self.store.add_documents(chunks)
-        chunks = load_design_rules(str(data_path))
-        self.store.add_documents(chunks)
+        # Only new or changed rules are embedded (see refresh())
+        self.last_sync = self.refresh()
+
+    def refresh(self) -> dict:
+        """
+        Re-index the rule file if it changed since it was last indexed.
+
+        The index manifest records the hash of the file the collection
+        was built from and the embedding model. If both match, nothing is
+        parsed or embedded. If the file changed, only new or changed rules
+        are upserted and removed ones deleted. A different embedding model
+        forces a full rebuild (vectors of two models can't be compared).
+
+        Returns:
+            dict with sync counts, or {"skipped": True} if already up to date
+        """
+        if getattr(self.store, "read_only", False):
+            # Attached to a shared index: the owner process re-indexes and republishes
+            changed = self.store.reload()
+            self._sync_shared()
+            return {"skipped": not changed, "generation": self.store.generation, "documents": self.store.count()}
+
+        if not self.sync_source:
+            # Store managed elsewhere: only rebuild the in-process indexes
+            with self._lock:
+                self._build_indexes()
+            return {"skipped": True, "documents": self.store.count()}
+
+        with self._lock:
+            source_hash = file_hash(self.data_path)
+            info = self.store.get_index_info()
+            if self.store.is_current(source_hash) and info.get("loader_version") == LOADER_VERSION:
+                if self.rules is None:
+                    self._build_indexes()
+                return {"skipped": True, "documents": self.store.count()}
+
+            # Streamed: rules are embedded batch by batch while the file is parsed
+            chunks = iter_design_rules(str(self.data_path))
+            if info and info.get("embedding_model") != self.store.embedder.name:
+                stats = self.store.rebuild(chunks)
+            else:
+                stats = self.store.sync_documents(chunks)
+            self.store.record_index_info(
+                source_hash=source_hash,
+                source_path=str(self.data_path.resolve()),
+                loader_version=LOADER_VERSION
+            )
+            self._build_indexes()
+            self._republish()
+            return {"skipped": False, **stats}
+
+    def rebuild(self) -> dict:
+        """Drop the index and re-embed the rule file from scratch"""
+        with self._lock:
+            stats = self.store.rebuild(iter_design_rules(str(self.data_path)))
+            self.store.record_index_info(
+                source_hash=file_hash(self.data_path),
+                source_path=str(self.data_path.resolve()),
+                loader_version=LOADER_VERSION
+            )
+            self._build_indexes()
+            self._republish()
+            return {"skipped": False, **stats}
+
+    def publish_shared(self, root: str = None) -> int:
+        """
+        Publish the index for other worker processes (see shared_index.py).
+
+        Workers attach with DesignRuleRetriever.attach_shared(root) and
+        map the same embedding matrix read-only. Later refresh()/rebuild()
+        calls that change the index publish a new generation automatically.
+
+        Args:
+            root: Shared index directory (default: <index_dir>/shared/<collection>)
+
+        Returns:
+            Published generation number
+        """
+        self.shared_root = Path(root) if root else (
+            self.store.config.index_dir / "shared" / self.store.collection_name
+        )
+        return publish_index(self.store, self.shared_root, source_hash=file_hash(self.data_path))
+
+    def _republish(self) -> None:
+        if self.shared_root is not None:
+            publish_index(self.store, self.shared_root, source_hash=file_hash(self.data_path))
+
+    @classmethod
+    def attach_shared(cls, root: str, config: VectorStoreConfig = None, **kwargs) -> "DesignRuleRetriever":
+        """
+        Retriever for a worker process, attached zero-copy to a published shared index.
+
+        Args:
+            root: Directory given to (or chosen by) publish_shared()
+            config: Store settings; only the embedder settings are used
+            **kwargs: Other DesignRuleRetriever options (search_mode, caches, ...)
+
+        Returns:
+            Read-only retriever that follows new generations as they are published
+        """
+        config = config or VectorStoreConfig()
+        embedder = create_embedder(
+            config.embedding_model,
+            batch_size=config.embedding_batch_size,
+            max_workers=config.embedding_workers
+        )
+        return cls(store=SharedIndexStore(root, embedder), **kwargs)
+
+    def _sync_shared(self) -> None:
+        """Rebuild the in-process indexes when a shared store moved to a new generation"""
+        if not getattr(self.store, "read_only", False):
+            return
+        generation = self.store.check()
+        if generation != self._indexed_generation:
+            with self._lock:
+                if generation != self._indexed_generation:
+                    self._build_indexes()
+                    self._indexed_generation = generation
+
+    def _build_indexes(self) -> None:
+        """
+        (Re)build the BM25 and rule-ID indexes from the stored chunks - no embedding involved.
+
+        Called whenever the index changed, so cached results (and
+        embeddings, in case the embedder changed) are dropped too and
+        change listeners are notified.
+        A shared index publishes these indexes with the generation, so
+        workers map them instead of decoding every record.
+        """
+        if getattr(self.store, "read_only", False):
+            self.lexical, self.rules, self.layer_detector = self.store.indexes()
+        else:
+            chunks = self.store.get_documents()
+            self.lexical = BM25Index(chunks)
+            self.rules = RuleIndex(chunks)
+            self.layer_detector = LayerDetector.from_chunks(chunks)
+        self.embedding_cache.clear()
+        self.result_cache.clear()
+        for listener in self._change_listeners:
+            listener()
+
+    def add_change_listener(self, listener: Callable[[], None]) -> None:
+        """Call listener() whenever the index changed (e.g. to drop results cached elsewhere)"""
+        if listener not in self._change_listeners:
+            self._change_listeners.append(listener)
+
+    def _embed_queries(self, questions: list[str]) -> np.ndarray:
+        """Embeddings of several queries; cache misses are encoded in one batch"""
+        keys = [normalize_query(q) for q in questions]
+        embeddings = {key: self.embedding_cache.get(key) for key in dict.fromkeys(keys)}
+        missing = [key for key, embedding in embeddings.items() if embedding is None]
+        if missing:
+            for key, embedding in zip(missing, self.store.embedder.embed(missing)):
+                embeddings[key] = embedding
+                self.embedding_cache.put(key, embedding)
+        return np.vstack([embeddings[key] for key in keys])
+
+    def search(self, question: str, n_results: int = 3, layer: str = None) -> list[dict]:
+        """
+        Retrieve the best matching chunks with the configured search mode.
+
+        In hybrid mode, both rankings are fetched a few results deep and
+        merged with reciprocal rank fusion, so exact-token hits (rule IDs,
+        layer names, values) and semantic hits both make the cut.
+
+        Without a layer, the layer is inferred from the question; if the
+        detector is confident, only that layer's partition is searched
+        (topped up from a global search if it has too few rules).
+
+        Args:
+            question: Natural language question
+            n_results: Number of chunks to return
+            layer: Optional layer filter
+
+        Returns:
+            List of results with text and metadata (best first)
+        """
+        return self.search_many([question], n_results, layer=layer)[0]
+
+    def infer_layer(self, question: str) -> str | None:
+        """Layer to restrict the search to, or None for a global search"""
+        if not self.auto_layer or self.layer_detector is None:
+            return None
+        guess = self.layer_detector.detect(question)
+        return guess.layer if guess.confidence >= self.layer_confidence else None
+
+    def search_many(self, questions: list[str], n_results: int = 3, layer: str = None) -> list[list[dict]]:
+        """
+        search() for several questions at once.
+
+        Cached questions are answered from the result cache; the rest
+        are embedded in one batch and searched with one vectorized
+        store query.
 
+        Args:
+            questions: Natural language questions
+            n_results: Number of chunks per question
+            layer: Optional layer filter
 
-    def query(self, question: str, n_results: int = 3, layer: str = None) -> str:
+        Returns:
+            One result list per question, in input order
+        """
+        self._sync_shared()
+
+        layers = [layer or self.infer_layer(q) for q in questions]
+        for question_layer in layers:
+            self._layer_stats["explicit" if layer else "inferred" if question_layer else "global"] += 1
+
+        keys = [(normalize_query(q), n_results, l, self.search_mode) for q, l in zip(questions, layers)]
+        results = [self.result_cache.get(key) for key in keys]
+
+        # Search each distinct uncached question once, one batch per layer partition
+        pending: dict[str | None, dict[tuple, str]] = {}
+        for question, key, cached in zip(questions, keys, results):
+            if cached is None:
+                pending.setdefault(key[2], {}).setdefault(key, question)
+
+        found = {}
+        for partition, group in pending.items():
+            group_questions = list(group.values())
+            group_results = self._search_many(group_questions, n_results, partition)
+            if partition and not layer:
+                group_results = self._top_up(group_questions, group_results, n_results)
+            for key, question_results in zip(group, group_results):
+                self.result_cache.put(key, question_results)
+                found[key] = question_results
+
+        return [list(cached if cached is not None else found[key]) for key, cached in zip(keys, results)]
+
+    def _top_up(self, questions: list[str], results: list[list[dict]], n_results: int) -> list[list[dict]]:
+        """Fill results of an inferred layer that has fewer than n_results rules from a global search"""
+        short = [i for i, question_results in enumerate(results) if len(question_results) < n_results]
+        if not short:
+            return results
+        global_results = self._search_many([questions[i] for i in short], n_results, None)
+        results = list(results)
+        for i, extra in zip(short, global_results):
+            seen = {r["metadata"].get("rule_id") for r in results[i]}
+            results[i] = results[i] + [r for r in extra if r["metadata"].get("rule_id") not in seen]
+            results[i] = results[i][:n_results]
+        return results
+
+    def _search_many(self, questions: list[str], n_results: int, layer: str) -> list[list[dict]]:
+        if self.search_mode == "lexical":
+            return [self.lexical.search(q, n_results, layer_filter=layer) for q in questions]
+        if self.search_mode == "vector":
+            return self.store.search_many(
+                questions, n_results, layer_filter=layer, query_embeddings=self._embed_queries(questions)
+            )
+
+        depth = max(n_results * 3, 10)
+        vector_results = self.store.search_many(
+            questions,
+            min(depth, self.store.count()),
+            layer_filter=layer,
+            query_embeddings=self._embed_queries(questions)
+        )
+        return [
+            reciprocal_rank_fusion(
+                [vector, self.lexical.search(question, depth, layer_filter=layer)],
+                [self.vector_weight, self.lexical_weight],
+                n_results,
+                k=self.rrf_k
+            )
+            for question, vector in zip(questions, vector_results)
+        ]
+
+    def stats(self) -> dict:
+        """Index size, search mode and cache hit rates"""
+        self._sync_shared()
+        return {
+            "documents": self.store.count(),
+            "search_mode": self.search_mode,
+            "embedder": self.store.embedder.name,
+            "layer_routing": dict(self._layer_stats),
+            "embedding_cache": self.embedding_cache.stats(),
+            "result_cache": self.result_cache.stats()
+        }
+
+    def close(self) -> None:
+        """Drop this retriever from the process-wide cache (see get_retriever)"""
+        with _retrievers_lock:
+            if _retrievers.get(self.data_path.resolve()) is self:
+                del _retrievers[self.data_path.resolve()]
+
+    def query(self, question: str, n_results: int = 3, layer: str = None, token_budget: int = None) -> str:
         """
         Query the design rules and return formatted context.
 
@@ -51,37 +414,52 @@ class DesignRuleRetriever:
             question: Natural language question
             n_results: Number of rules to retrieve
             layer: Optional layer filter (e.g., "Metal1", "Poly")
+            token_budget: Context size limit (default: the packer's budget)
 
         Returns:
             Formatted string with relevant design rules for LLM context
         """
         # TODO 4: Search the vector store
-        # Hint: results = self.store.search(question, n_results, layer_filter=layer)
-        results = self.store.search(question, n_results, layer_filter=layer)
+        # Hybrid BM25 + vector search by default (see search())
+        results = self.search(question, n_results, layer=layer)
 
 
         # TODO 5: Format results as context string for LLM
-        # Example format:
-        # """
-        # Relevant Design Rules:
-        #
-        # [Rule M1.W.1 - Metal1]
-        # Value: 18nm
-        # <full rule text>
-        #
-        # [Rule M1.S.1 - Metal1]
-        # ...
-        # """
-
-        context_lines = ["Relevant Design Rules:\n"]
-        for res in results:
-            metadata = res["metadata"]
-            context_lines.append(f"[Rule {metadata.get('rule_id', 'N/A')} - {metadata.get('layer', 'N/A')}]")
-            context_lines.append(f"Value: {metadata.get('value', 'N/A')}")
-            context_lines.append(res["text"])
-            context_lines.append("")  # Blank line for separation
-
-        return "\n".join(context_lines)
+        # Packed within the token budget (see context_packer.py)
+        return self.pack_context(results, token_budget, question=question).text
+
+    def query_many(
+        self,
+        questions: list[str],
+        n_results: int = 3,
+        layer: str = None,
+        token_budget: int = None
+    ) -> list[str]:
+        """
+        Query the design rules for many questions at once.
+
+        Args:
+            questions: Natural language questions (e.g. one per violated rule)
+            n_results: Number of rules to retrieve per question
+            layer: Optional layer filter applied to every question
+            token_budget: Context size limit per question (default: the packer's budget)
+
+        Returns:
+            Formatted context strings, in the order of the questions
+        """
+        return [
+            self.pack_context(results, token_budget, question=question).text
+            for question, results in zip(questions, self.search_many(questions, n_results, layer=layer))
+        ]
+
+    def pack_context(self, results: list[dict], token_budget: int = None, question: str = None):
+        """Pack search results into LLM context with the retriever's packer (returns PackedContext)"""
+        return self.packer.pack(
+            results,
+            distance_metric=getattr(self.store, "distance_metric", "cosine"),
+            token_budget=token_budget,
+            question=question
+        )
 
     def get_rule(self, rule_id: str) -> dict | None:
         """
@@ -94,19 +472,107 @@ class DesignRuleRetriever:
             Rule data or None if not found
         """
         # TODO 6: Search with the exact rule_id
-        # This is a simple keyword search for now
-        results = self.store.search(rule_id, n_results=1)
+        # Dictionary lookup in the rule index (no embedding query)
+        self._sync_shared()
+        return self.rules.get(rule_id)
+
+    def find_rules(self, pattern: str = None, layer: str = None, category: str = None) -> list[dict]:
+        """
+        List rules by ID prefix, layer and/or category.
+
+        Args:
+            pattern: Rule ID prefix (e.g. "M1.S.*" for all Metal1 spacing rules)
+            layer: Layer filter (e.g. "Metal1")
+            category: Rule category: W, S, A or E (or width, spacing, area, enclosure)
 
-        return results[0] if results else None
+        Returns:
+            Matching rules ({"text", "metadata"}) in ID order
+        """
+        self._sync_shared()
+        results = self.rules.prefix(pattern) if pattern else self.rules.find(layer, category)
+        if pattern and (layer or category):
+            allowed = {r["metadata"]["rule_id"] for r in self.rules.find(layer, category)}
+            results = [r for r in results if r["metadata"]["rule_id"] in allowed]
+        return results
+
+
+_retrievers: dict[Path, DesignRuleRetriever] = {}
+_retrievers_lock = threading.Lock()
+
+
+def get_retriever(data_path: str = None) -> DesignRuleRetriever:
+    """
+    Process-wide retriever for a rule file.
+
+    The first call indexes the file (or reuses the persisted index);
+    later calls return the same warm instance, so a query costs only
+    the search itself.
+    """
+    path = Path(data_path or DEFAULT_DATA_PATH).resolve()
+    with _retrievers_lock:
+        if path not in _retrievers:
+            _retrievers[path] = DesignRuleRetriever(str(path))
+        return _retrievers[path]
+
+
+# Tool definition for agent integration
+QUERY_DOCUMENTATION_TOOL = {
+    "name": "query_documentation",
+    "description": "Search the design rule manual (DRM) for rules relevant to a question. "
+                   "Returns the best matching rules (ID, layer, value, condition and description). "
+                   "For several questions at once, use query_documentation_batch.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "query": {
+                "type": "string",
+                "description": "Natural language question (e.g., 'via array spacing')"
+            },
+            "layer": {
+                "type": "string",
+                "description": "Optional layer filter as written in the DRM (e.g., Metal1, Poly, VIA1)"
+            }
+        },
+        "required": ["query"]
+    }
+}
+
+
+QUERY_DOCUMENTATION_BATCH_TOOL = {
+    "name": "query_documentation_batch",
+    "description": "Search the design rule manual (DRM) for several questions in one call, "
+                   "e.g. one per violated rule in a DRC report. "
+                   "Returns the best matching rules for each question, in order.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "queries": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Natural language questions (e.g., ['M1 minimum spacing', 'VIA1 enclosure'])"
+            },
+            "n_results": {
+                "type": "integer",
+                "description": "Rules to return per question (default: 3)"
+            },
+            "layer": {
+                "type": "string",
+                "description": "Optional layer filter applied to every question (e.g., Metal1)"
+            }
+        },
+        "required": ["queries"]
+    }
+}
 
 
 # Tool handler for integration with agent
-def handle_query_documentation(inputs: dict) -> str:
+def handle_query_documentation(inputs: dict, retriever: DesignRuleRetriever = None) -> str:
     """
     Tool handler for the agent.
 
     Args:
         inputs: {"query": "...", "layer": "..." (optional)}
+        retriever: Long-lived retriever to use (the process-wide one if not given)
 
     Returns:
         JSON string with search results
@@ -115,7 +581,8 @@ def handle_query_documentation(inputs: dict) -> str:
 
 
     # TODO 7: Create retriever instance (consider caching)
-    retriever = DesignRuleRetriever()
+    if retriever is None:
+        retriever = get_retriever()
 
     # TODO 8: Extract query and optional layer from inputs
     query = inputs.get("query", "")
@@ -127,6 +594,29 @@ def handle_query_documentation(inputs: dict) -> str:
     return json.dumps({"context": result})      
 
 
+def handle_query_documentation_batch(inputs: dict, retriever: DesignRuleRetriever = None) -> str:
+    """
+    Tool handler for batched documentation queries.
+
+    Args:
+        inputs: {"queries": [...], "n_results": 3 (optional), "layer": "..." (optional)}
+        retriever: Long-lived retriever to use (the process-wide one if not given)
+
+    Returns:
+        JSON string with one context per query, in input order
+    """
+    import json
+
+    if retriever is None:
+        retriever = get_retriever()
+
+    queries = inputs.get("queries") or []
+    contexts = retriever.query_many(queries, n_results=inputs.get("n_results", 3), layer=inputs.get("layer"))
+    return json.dumps({
+        "results": [{"query": query, "context": context} for query, context in zip(queries, contexts)]
+    })
+
+
 # Test function
 if __name__ == "__main__":
     print("=== Design Rule Retriever Test ===\n")
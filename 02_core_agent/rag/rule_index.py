@@ -0,0 +1,127 @@
+"""
+Rule Metadata Index
+Exact and prefix lookups by rule ID, layer and rule category.
+
+Rule IDs follow <LAYER>.<CATEGORY>.<N> (e.g. M1.S.2), where the
+category is W (width), S (spacing), A (area) or E (enclosure/extension).
+Lookups are dictionary hits (or a bisect over the sorted IDs for
+prefixes), so they never touch the embedding model.
+"""
+
+import bisect
+from collections import defaultdict
+
+try:
+    from .document_loader import DocumentChunk
+except ImportError:
+    from document_loader import DocumentChunk
+
+RULE_CATEGORIES = {
+    "W": "width",
+    "S": "spacing",
+    "A": "area",
+    "E": "enclosure",
+}
+
+
+def parse_rule_id(rule_id: str) -> tuple[str, str, str]:
+    """
+    Split a rule ID into (layer prefix, category, number).
+
+    "M1.S.2" -> ("M1", "S", "2"); missing parts are returned as "".
+    """
+    parts = rule_id.strip().upper().split(".")
+    parts += [""] * (3 - len(parts))
+    return parts[0], parts[1], ".".join(parts[2:])
+
+
+class RuleIndex:
+    """In-memory index of rule chunks by ID, layer and category"""
+
+    def __init__(self, chunks: list[DocumentChunk]):
+        """
+        Args:
+            chunks: Rule chunks with a "rule_id" (and "layer") in their metadata
+        """
+        self.by_id: dict[str, DocumentChunk] = {}
+        self.by_layer: dict[str, list[str]] = defaultdict(list)
+        self.by_category: dict[str, list[str]] = defaultdict(list)
+
+        for chunk in chunks:
+            rule_id = chunk.metadata.get("rule_id", "").upper()
+            if not rule_id:
+                continue
+            self.by_id[rule_id] = chunk
+            self.by_layer[chunk.metadata.get("layer", "N/A").upper()].append(rule_id)
+            self.by_category[parse_rule_id(rule_id)[1]].append(rule_id)
+
+        # Sorted IDs for prefix range lookups
+        self._sorted_ids = sorted(self.by_id)
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def get(self, rule_id: str) -> dict | None:
+        """
+        Exact, case-insensitive rule lookup.
+
+        Returns:
+            {"text", "metadata"} result or None if the rule doesn't exist
+        """
+        chunk = self.by_id.get(rule_id.strip().upper())
+        return self._result(chunk) if chunk else None
+
+    def prefix(self, pattern: str) -> list[dict]:
+        """
+        All rules whose ID starts with a prefix.
+
+        Args:
+            pattern: ID prefix, with or without a trailing ".*" / "*"
+                     (e.g. "M1.S.*", "M1.S", "VIA1")
+
+        Returns:
+            Matching rules in ID order
+        """
+        prefix = pattern.strip().upper().rstrip("*").rstrip(".")
+        if not prefix:
+            return [self._result(self.by_id[rule_id]) for rule_id in self._sorted_ids]
+
+        # Match whole ID components: "M1" must not match "M10.W.1"
+        start = bisect.bisect_left(self._sorted_ids, prefix)
+        results = []
+        for rule_id in self._sorted_ids[start:]:
+            if not rule_id.startswith(prefix):
+                break
+            if rule_id == prefix or rule_id[len(prefix)] == ".":
+                results.append(self._result(self.by_id[rule_id]))
+        return results
+
+    def find(self, layer: str = None, category: str = None) -> list[dict]:
+        """
+        Rules filtered by layer and/or category.
+
+        Args:
+            layer: Layer as written in the DRM (e.g. "Metal1"), case-insensitive
+            category: "W", "S", "A" or "E" (or "width", "spacing", ...)
+
+        Returns:
+            Matching rules in ID order
+        """
+        candidates = set(self.by_id)
+        if layer:
+            candidates &= set(self.by_layer.get(layer.upper(), ()))
+        if category:
+            candidates &= set(self.by_category.get(self._category_code(category), ()))
+        return [self._result(self.by_id[rule_id]) for rule_id in sorted(candidates)]
+
+    @staticmethod
+    def _category_code(category: str) -> str:
+        category = category.strip().lower()
+        for code, name in RULE_CATEGORIES.items():
+            if category in (code.lower(), name):
+                return code
+        return category.upper()
+
+    @staticmethod
+    def _result(chunk: DocumentChunk) -> dict:
+        return {"text": chunk.text, "metadata": chunk.metadata}
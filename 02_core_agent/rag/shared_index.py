@@ -0,0 +1,419 @@
+"""
+Shared Index
+One read-only copy of the embedding matrix and metadata for all workers.
+
+The owner process publishes its index as a "generation": a directory of
+files that are only ever read, never modified:
+    embeddings.npy   normalized embeddings (rows grouped by layer)
+    offsets.npy      int64 byte offsets of each row's record (n + 1)
+    records.bin      packed UTF-8 JSON records {"id", "text", "metadata"}
+    vocab.npy        sorted BM25 terms (fixed-width bytes)
+    term_offsets.npy int64 start of each term's postings (n_terms + 1)
+    postings.npy     int32 (row, term frequency) pairs, grouped by term
+    doc_lengths.npy  int32 BM25 length of each row
+    rule_ids.npy     sorted upper-case rule IDs (fixed-width bytes)
+    rule_rows.npy    int32 row of each rule ID
+    header.json      count, dtype, embedder, layer partitions, BM25
+                     parameters, rule-ID prefixes, source hash
+
+Workers memory-map these files, so every process reads the same physical
+pages from the OS page cache instead of holding its own copy. Vector
+search, BM25 search and rule-ID lookups all run on the mapped arrays;
+records are decoded only for the rows they return.
+
+A rebuild publishes a new generation and then atomically replaces the
+CURRENT pointer file; readers pick it up on their next check and swap
+to it in a single reference assignment, so a search never sees a
+half-written index.
+"""
+
+import json
+import math
+import shutil
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from .document_loader import DocumentChunk
+    from .embeddings import Embedder, EmbedderMismatchError
+    from .layer_detector import LayerDetector
+    from .lexical import INDEXED_METADATA, tokenize
+    from .numpy_store import current_generation, generation_dir, publish_generation, top_k_rows
+    from .rule_index import RuleIndex, parse_rule_id
+except ImportError:
+    from document_loader import DocumentChunk
+    from embeddings import Embedder, EmbedderMismatchError
+    from layer_detector import LayerDetector
+    from lexical import INDEXED_METADATA, tokenize
+    from numpy_store import current_generation, generation_dir, publish_generation, top_k_rows
+    from rule_index import RuleIndex, parse_rule_id
+
+HEADER_FILE = "header.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+OFFSETS_FILE = "offsets.npy"
+RECORDS_FILE = "records.bin"
+VOCAB_FILE = "vocab.npy"
+TERM_OFFSETS_FILE = "term_offsets.npy"
+POSTINGS_FILE = "postings.npy"
+DOC_LENGTHS_FILE = "doc_lengths.npy"
+RULE_IDS_FILE = "rule_ids.npy"
+RULE_ROWS_FILE = "rule_rows.npy"
+
+# BM25 parameters of the published postings (same defaults as lexical.BM25Index)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def publish_index(store, root: Path, keep_generations: int = 2, **header) -> int:
+    """
+    Publish a store's rows as a new shared generation.
+
+    Args:
+        store: VectorStore or NumpyVectorStore (anything with export_rows() and embedder)
+        root: Shared index directory
+        keep_generations: Older generations kept for readers still using them
+        **header: Extra header values (e.g. source_hash)
+
+    Returns:
+        Number of the published generation
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    ids, texts, metadatas, embeddings = store.export_rows()
+
+    # Group rows by layer so every layer partition is one contiguous slice
+    order = sorted(range(len(ids)), key=lambda i: metadatas[i].get("layer", ""))
+    partitions: dict[str, list[int]] = {}
+    records, offsets = bytearray(), [0]
+    # BM25 postings and rule-ID table, so workers never rebuild them from decoded records
+    postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+    doc_lengths, rule_rows, prefixes = [], {}, {}
+    for row, i in enumerate(order):
+        metadata = metadatas[i]
+        layer = metadata.get("layer", "")
+        partitions.setdefault(layer, [row, row])[1] = row + 1
+        records += json.dumps({"id": ids[i], "text": texts[i], "metadata": metadata}).encode("utf-8")
+        offsets.append(len(records))
+
+        fields = [texts[i]] + [str(metadata.get(key, "")) for key in INDEXED_METADATA]
+        counts = Counter(tokenize(" ".join(fields)))
+        doc_lengths.append(sum(counts.values()))
+        for token, tf in counts.items():
+            postings[token].append((row, tf))
+
+        rule_id = metadata.get("rule_id", "").upper()
+        if rule_id:
+            rule_rows[rule_id] = row
+            prefix = parse_rule_id(rule_id)[0]
+            if prefix and layer and layer != "N/A":
+                prefixes.setdefault(prefix, layer)
+    if ids:
+        matrix = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)[order]
+    else:
+        matrix = np.zeros((0, 0), dtype=np.float32)
+    dtype = getattr(getattr(store, "config", None), "dtype", "float32")
+
+    generation = current_generation(root) + 1
+    # Write into a temporary directory, then rename it into place
+    tmp_dir = root / f".{generation_dir(generation)}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir()
+    np.save(tmp_dir / EMBEDDINGS_FILE, matrix.astype(dtype))
+    np.save(tmp_dir / OFFSETS_FILE, np.asarray(offsets, dtype=np.int64))
+    (tmp_dir / RECORDS_FILE).write_bytes(bytes(records))
+
+    vocab = sorted(postings)
+    term_offsets = np.cumsum([0] + [len(postings[term]) for term in vocab], dtype=np.int64)
+    pairs = [pair for term in vocab for pair in postings[term]]
+    rule_ids = sorted(rule_rows)
+    np.save(tmp_dir / VOCAB_FILE, np.array([term.encode("utf-8") for term in vocab], dtype="S"))
+    np.save(tmp_dir / TERM_OFFSETS_FILE, term_offsets)
+    np.save(tmp_dir / POSTINGS_FILE, np.array(pairs, dtype=np.int32).reshape(len(pairs), 2))
+    np.save(tmp_dir / DOC_LENGTHS_FILE, np.asarray(doc_lengths, dtype=np.int32))
+    np.save(tmp_dir / RULE_IDS_FILE, np.array([rule_id.encode("utf-8") for rule_id in rule_ids], dtype="S"))
+    np.save(tmp_dir / RULE_ROWS_FILE, np.asarray([rule_rows[rule_id] for rule_id in rule_ids], dtype=np.int32))
+    (tmp_dir / HEADER_FILE).write_text(json.dumps({
+        "generation": generation,
+        "count": len(ids),
+        "dtype": dtype,
+        "embedding_model": store.embedder.name,
+        "partitions": partitions,
+        "rule_prefixes": prefixes,
+        "bm25": {"k1": BM25_K1, "b": BM25_B},
+        "published_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        **header
+    }, indent=2))
+    publish_generation(root, tmp_dir, generation, keep_generations)
+    return generation
+
+
+@dataclass
+class _Generation:
+    """One published, memory-mapped generation"""
+    number: int
+    header: dict
+    embeddings: np.ndarray
+    offsets: np.ndarray
+    records: np.ndarray
+    vocab: np.ndarray
+    term_offsets: np.ndarray
+    postings: np.ndarray
+    doc_lengths: np.ndarray
+    rule_ids: np.ndarray
+    rule_rows: np.ndarray
+
+    def record(self, row: int) -> dict:
+        start, end = self.offsets[row], self.offsets[row + 1]
+        return json.loads(self.records[start:end].tobytes())
+
+    def result(self, row: int) -> dict:
+        record = self.record(row)
+        return {"text": record["text"], "metadata": record["metadata"]}
+
+    def rows(self, layer: str) -> slice:
+        """Row range of a layer partition (empty if the layer isn't indexed)"""
+        start, end = self.header["partitions"].get(layer, (0, 0))
+        return slice(start, end)
+
+
+class SharedBM25Index:
+    """BM25 over a generation's mapped postings (same search() as lexical.BM25Index)"""
+
+    def __init__(self, generation: _Generation):
+        self.generation = generation
+        self.k1 = generation.header["bm25"]["k1"]
+        self.b = generation.header["bm25"]["b"]
+        count = generation.header["count"]
+        self.avg_length = float(np.mean(generation.doc_lengths)) if count else 0.0
+
+    def search(self, query: str, n_results: int = 3, layer_filter: str = None) -> list[dict]:
+        """
+        Rank rows by BM25 score.
+
+        Args:
+            query: Query text
+            n_results: Number of results to return
+            layer_filter: Optional exact layer filter (searches only that partition)
+
+        Returns:
+            List of results with text, metadata and score (highest first)
+        """
+        generation = self.generation
+        count = generation.header["count"]
+        scores = np.zeros(count, dtype=np.float64)
+        for token in set(tokenize(query)):
+            term = token.encode("utf-8")
+            index = int(np.searchsorted(generation.vocab, term))
+            if index >= len(generation.vocab) or generation.vocab[index] != term:
+                continue
+            pairs = generation.postings[generation.term_offsets[index]:generation.term_offsets[index + 1]]
+            rows, tf = pairs[:, 0], pairs[:, 1].astype(np.float64)
+            idf = math.log(1 + (count - len(rows) + 0.5) / (len(rows) + 0.5))
+            norm = 1 - self.b + self.b * generation.doc_lengths[rows] / self.avg_length
+            np.add.at(scores, rows, idf * tf * (self.k1 + 1) / (tf + self.k1 * norm))
+
+        part = generation.rows(layer_filter) if layer_filter else slice(0, count)
+        candidates = part.start + np.flatnonzero(scores[part] > 0)
+        # Highest score first, ties in row order
+        ranked = candidates[np.lexsort((candidates, -scores[candidates]))[:n_results]]
+        return [{**generation.result(int(row)), "score": float(scores[row])} for row in ranked]
+
+
+class SharedRuleIndex:
+    """Rule-ID lookups on a generation's mapped ID table (same interface as rule_index.RuleIndex)"""
+
+    def __init__(self, generation: _Generation):
+        self.generation = generation
+        # Layer names are matched case-insensitively, like RuleIndex
+        self._layers = {layer.upper(): layer for layer in generation.header["partitions"]}
+
+    def __len__(self) -> int:
+        return len(self.generation.rule_ids)
+
+    def _find_id(self, rule_id: str) -> int:
+        return int(np.searchsorted(self.generation.rule_ids, rule_id.encode("utf-8")))
+
+    def get(self, rule_id: str) -> dict | None:
+        """Exact, case-insensitive rule lookup ({"text", "metadata"} or None)"""
+        key = rule_id.strip().upper()
+        index = self._find_id(key)
+        if index < len(self) and self.generation.rule_ids[index] == key.encode("utf-8"):
+            return self.generation.result(int(self.generation.rule_rows[index]))
+        return None
+
+    def prefix(self, pattern: str) -> list[dict]:
+        """All rules whose ID starts with a prefix, in ID order (see RuleIndex.prefix)"""
+        prefix = pattern.strip().upper().rstrip("*").rstrip(".")
+        results = []
+        for index in range(self._find_id(prefix) if prefix else 0, len(self)):
+            rule_id = self.generation.rule_ids[index].decode("utf-8")
+            if not rule_id.startswith(prefix):
+                break
+            # Match whole ID components: "M1" must not match "M10.W.1"
+            if not prefix or rule_id == prefix or rule_id[len(prefix)] == ".":
+                results.append(self.generation.result(int(self.generation.rule_rows[index])))
+        return results
+
+    def find(self, layer: str = None, category: str = None) -> list[dict]:
+        """Rules filtered by layer and/or category, in ID order (see RuleIndex.find)"""
+        rows = None
+        if layer:
+            rows = self.generation.rows(self._layers.get(layer.upper(), layer))
+        code = RuleIndex._category_code(category) if category else None
+        results = []
+        for rule_id, row in zip(self.generation.rule_ids, self.generation.rule_rows):
+            if rows is not None and not rows.start <= row < rows.stop:
+                continue
+            if code and parse_rule_id(rule_id.decode("utf-8"))[1] != code:
+                continue
+            results.append(self.generation.result(int(row)))
+        return results
+
+
+class SharedIndexStore:
+    """
+    Read-only store attached to a published shared index.
+
+    Offers the search side of the VectorStore interface (search,
+    search_many, get_documents, count); the owner process rebuilds and
+    republishes. Checks for a new generation at most every
+    check_interval seconds.
+    """
+
+    read_only = True
+    distance_metric = "cosine"
+
+    def __init__(self, root: Path, embedder: Embedder, check_interval: float = 1.0):
+        """
+        Args:
+            root: Shared index directory (see publish_index)
+            embedder: Embedder for queries; must match the published one
+            check_interval: Seconds between checks of the CURRENT pointer
+        """
+        self.root = Path(root)
+        self.embedder = embedder
+        self.check_interval = check_interval
+        self._generation: _Generation = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        if not self.reload():
+            raise FileNotFoundError(f"No shared index published in {self.root}")
+
+    @property
+    def generation(self) -> int:
+        return self._generation.number
+
+    def reload(self) -> bool:
+        """Attach to the newest generation; True if it changed"""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            number = current_generation(self.root)
+            if number == 0 or (self._generation and self._generation.number == number):
+                return False
+
+            path = self.root / generation_dir(number)
+            header = json.loads((path / HEADER_FILE).read_text())
+            if header["embedding_model"] != self.embedder.name:
+                raise EmbedderMismatchError(
+                    f"Shared index was built with {header['embedding_model']}, not {self.embedder.name}"
+                )
+            # Single reference assignment: searches in flight keep the old generation
+            self._generation = _Generation(
+                number=number,
+                header=header,
+                embeddings=np.load(path / EMBEDDINGS_FILE, mmap_mode="r"),
+                offsets=np.load(path / OFFSETS_FILE, mmap_mode="r"),
+                records=np.memmap(path / RECORDS_FILE, dtype=np.uint8, mode="r")
+                if header["count"] else np.zeros(0, dtype=np.uint8),
+                vocab=np.load(path / VOCAB_FILE, mmap_mode="r"),
+                term_offsets=np.load(path / TERM_OFFSETS_FILE, mmap_mode="r"),
+                postings=np.load(path / POSTINGS_FILE, mmap_mode="r"),
+                doc_lengths=np.load(path / DOC_LENGTHS_FILE, mmap_mode="r"),
+                rule_ids=np.load(path / RULE_IDS_FILE, mmap_mode="r"),
+                rule_rows=np.load(path / RULE_ROWS_FILE, mmap_mode="r")
+            )
+            return True
+
+    def check(self) -> int:
+        """Swap to a newer generation if one was published (rate-limited); returns the generation"""
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self.reload()
+        return self._generation.number
+
+    def indexes(self) -> tuple[SharedBM25Index, SharedRuleIndex, LayerDetector]:
+        """BM25, rule-ID and layer indexes of the attached generation (no records decoded)"""
+        generation = self._generation
+        layers = [layer for layer in generation.header["partitions"] if layer and layer != "N/A"]
+        return (
+            SharedBM25Index(generation),
+            SharedRuleIndex(generation),
+            LayerDetector(layers, generation.header["rule_prefixes"])
+        )
+
+    def get_index_info(self) -> dict:
+        """Header of the attached generation"""
+        return dict(self._generation.header)
+
+    def count(self) -> int:
+        return self._generation.header["count"]
+
+    def get_documents(self) -> list[DocumentChunk]:
+        """All chunks of the attached generation (decodes every record)"""
+        generation = self._generation
+        return [
+            DocumentChunk(text=record["text"], metadata=record["metadata"])
+            for record in map(generation.record, range(generation.header["count"]))
+        ]
+
+    def search(self, query: str, n_results: int = 3, layer_filter: str = None, query_embedding=None) -> list[dict]:
+        """Search one query (see search_many)"""
+        embeddings = None if query_embedding is None else np.asarray(query_embedding)[None, :]
+        return self.search_many([query], n_results, layer_filter, query_embeddings=embeddings)[0]
+
+    def search_many(
+        self,
+        queries: list[str],
+        n_results: int = 3,
+        layer_filter: str = None,
+        query_embeddings: np.ndarray = None
+    ) -> list[list[dict]]:
+        """
+        Search the shared matrix for several queries.
+
+        Args:
+            queries: Natural language queries
+            n_results: Number of results per query
+            layer_filter: Optional filter by layer (searches only that partition)
+            query_embeddings: Precomputed embeddings, one row per query
+
+        Returns:
+            One result list per query, in input order
+        """
+        if not queries:
+            return []
+        self.check()
+        generation = self._generation
+        if query_embeddings is None:
+            query_embeddings = self.embedder.embed(queries)
+
+        part = None
+        if layer_filter:
+            start, end = generation.header["partitions"].get(layer_filter, (0, 0))
+            part = slice(start, end)
+
+        results = []
+        for hits in top_k_rows(generation.embeddings, query_embeddings, n_results, part):
+            question_results = []
+            for row, distance in hits:
+                record = generation.record(row)
+                question_results.append({"text": record["text"], "metadata": record["metadata"], "distance": distance})
+            results.append(question_results)
+        return results
+
+    def rebuild(self, chunks: list[DocumentChunk]) -> dict:
+        raise RuntimeError("Shared index is read-only: rebuild and republish it in the owner process")
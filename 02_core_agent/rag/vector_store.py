@@ -3,33 +3,78 @@ Vector Store using ChromaDB
 Stores document embeddings and enables similarity search.
 """
 
+import hashlib
+import json
+from typing import Iterable
+
 import chromadb
+import numpy as np
 from chromadb.config import Settings
 
 try:
+    from .config import IndexManifest, VectorStoreConfig
     from .document_loader import DocumentChunk
+    from .embeddings import Embedder, EmbedderMismatchError, create_embedder
 except ImportError:
+    from config import IndexManifest, VectorStoreConfig
     from document_loader import DocumentChunk
+    from embeddings import Embedder, EmbedderMismatchError, create_embedder
+
+
+def content_hash(text: str) -> str:
+    """Stable fingerprint of a chunk's text, used to detect changed rules"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def document_id(chunk: DocumentChunk) -> str:
+    """Store ID of a chunk: its chunk_id (ingested documents) or rule_id (DRM rules)"""
+    return chunk.metadata.get("chunk_id") or chunk.metadata.get("rule_id")
+
+
+def chunk_hash(chunk: DocumentChunk) -> str:
+    """Fingerprint of a chunk's text and metadata (a parser change updates the metadata too)"""
+    return content_hash(chunk.text + "\0" + json.dumps(chunk.metadata, sort_keys=True, default=str))
 
 
 class VectorStore:
     """ChromaDB-based vector store for design rule documents."""
 
-    def __init__(self, collection_name: str = "design_rules"):
+    def __init__(self, collection_name: str = None, config: VectorStoreConfig = None, embedder: Embedder = None):
         """
         Initialize the vector store.
 
         Args:
-            collection_name: Name of the ChromaDB collection
+            collection_name: Name of the ChromaDB collection (default: derived from config)
+            config: Store settings (default: persistent store in the package's chroma_db/)
+            embedder: Embedder to use (default: built from config.embedding_model)
         """
+        self.config = config or VectorStoreConfig()
+        self.collection_name = collection_name or self.config.collection_name
+        self.manifest = IndexManifest(self.config)
+        # Embeddings are computed here and passed to Chroma, so Chroma's
+        # own embedding function is never called
+        self.embedder = embedder or create_embedder(
+            self.config.embedding_model,
+            batch_size=self.config.embedding_batch_size,
+            max_workers=self.config.embedding_workers
+        )
+        self._index_embedder = self.get_index_info().get("embedding_model")
+
         # TODO 1: Initialize ChromaDB client (persistent or in-memory)
-        # Hint: chromadb.Client() for in-memory
-        # Hint: chromadb.PersistentClient(path="./chroma_db") for persistent
-        self.client = chromadb.PersistentClient(path="./chroma_db")
+        # The index directory is absolute, so every working directory shares one index
+        if self.config.persistent:
+            self.client = chromadb.PersistentClient(path=str(self.config.index_dir))
+        else:
+            self.client = chromadb.EphemeralClient()
 
         # TODO 2: Get or create collection
         # Hint: self.client.get_or_create_collection(name=collection_name)
-        self.collection = self.client.get_or_create_collection(name=collection_name)
+        self.collection = self.client.get_or_create_collection(name=self.collection_name)
+
+    @property
+    def distance_metric(self) -> str:
+        """Chroma's distance function: l2 (squared L2, the default), cosine or ip"""
+        return (self.collection.metadata or {}).get("hnsw:space", "l2")
 
     def add_documents(self, chunks: list[DocumentChunk]) -> None:
         """
@@ -44,15 +89,198 @@ class VectorStore:
         # - ids: list of unique IDs (use rule_id or generate)
         documents = [chunk.text for chunk in chunks]
         metadatas = [chunk.metadata for chunk in chunks]
-        ids = [chunk.metadata.get("rule_id") for chunk in chunks]   
+        ids = [document_id(chunk) for chunk in chunks]
 
 
         # TODO 4: Add to collection
         # Hint: self.collection.add(documents=..., metadatas=..., ids=...)
-        self.collection.add(documents=documents, metadatas=metadatas, ids=ids)
+        self._check_embedder()
+        embeddings = self.embedder.embed(documents)
+        self.collection.add(documents=documents, metadatas=metadatas, ids=ids, embeddings=embeddings)
+        self._mark_embedder()
+
+    def sync_documents(self, chunks: Iterable[DocumentChunk]) -> dict:
+        """
+        Bring the collection in line with chunks, embedding as little as possible.
+
+        Each chunk is stored with a hash of its text. Only new or changed
+        chunks are upserted (and embedded); chunks no longer present are
+        deleted; unchanged chunks are left alone. Changed chunks are
+        embedded one batch at a time as they arrive, so a streaming
+        loader (iter_design_rules) overlaps parsing and embedding.
 
+        Args:
+            chunks: Complete, current chunks for this collection (list or generator)
 
-    def search(self, query: str, n_results: int = 3, layer_filter: str = None) -> list[dict]:
+        Returns:
+            dict with counts of added, updated, removed and unchanged chunks
+        """
+        self._check_embedder()
+        existing = self.collection.get(include=["metadatas"])
+        stored_hashes = {
+            doc_id: (metadata or {}).get("content_hash")
+            for doc_id, metadata in zip(existing["ids"], existing["metadatas"])
+        }
+
+        to_upsert = []
+        added = updated = 0
+        current_ids = set()
+        for chunk in chunks:
+            doc_id = document_id(chunk)
+            current_ids.add(doc_id)
+            digest = chunk_hash(chunk)
+            if stored_hashes.get(doc_id) == digest:
+                continue
+            if doc_id in stored_hashes:
+                updated += 1
+            else:
+                added += 1
+            to_upsert.append((doc_id, chunk, digest))
+            if len(to_upsert) >= self.embedder.batch_size:
+                self._upsert(to_upsert)
+                to_upsert = []
+
+        if to_upsert:
+            self._upsert(to_upsert)
+
+        stale_ids = [doc_id for doc_id in stored_hashes if doc_id not in current_ids]
+        if stale_ids:
+            self.collection.delete(ids=stale_ids)
+
+        return {
+            "added": added,
+            "updated": updated,
+            "removed": len(stale_ids),
+            "unchanged": len(current_ids) - added - updated
+        }
+
+    def upsert_documents(self, chunks: Iterable[DocumentChunk]) -> dict:
+        """
+        Add or update chunks without touching the rest of the collection.
+
+        Chunks whose stored hash is unchanged are skipped; the others
+        are embedded and written one batch at a time.
+
+        Args:
+            chunks: Chunks to write
+
+        Returns:
+            dict with counts of added, updated and unchanged chunks
+        """
+        self._check_embedder()
+        chunks = list(chunks)
+        ids = [document_id(chunk) for chunk in chunks]
+        stored_hashes = {}
+        if ids:
+            existing = self.collection.get(ids=ids, include=["metadatas"])
+            stored_hashes = {
+                doc_id: (metadata or {}).get("content_hash")
+                for doc_id, metadata in zip(existing["ids"], existing["metadatas"])
+            }
+
+        batch = []
+        added = updated = 0
+        for doc_id, chunk in zip(ids, chunks):
+            digest = chunk_hash(chunk)
+            if stored_hashes.get(doc_id) == digest:
+                continue
+            if doc_id in stored_hashes:
+                updated += 1
+            else:
+                added += 1
+            batch.append((doc_id, chunk, digest))
+            if len(batch) >= self.embedder.batch_size:
+                self._upsert(batch)
+                batch = []
+        if batch:
+            self._upsert(batch)
+
+        return {"added": added, "updated": updated, "unchanged": len(chunks) - added - updated}
+
+    def delete_documents(self, ids: list[str]) -> int:
+        """Delete chunks by ID; returns the number of IDs given"""
+        ids = list(ids)
+        if ids:
+            self.collection.delete(ids=ids)
+        return len(ids)
+
+    def _upsert(self, batch: list[tuple[str, DocumentChunk, str]]) -> None:
+        """Embed and upsert (id, chunk, content hash) entries"""
+        documents = [chunk.text for _, chunk, _ in batch]
+        self.collection.upsert(
+            ids=[doc_id for doc_id, _, _ in batch],
+            documents=documents,
+            metadatas=[{**chunk.metadata, "content_hash": digest} for _, chunk, digest in batch],
+            embeddings=self.embedder.embed(documents)
+        )
+        self._mark_embedder()
+
+    def get_documents(self) -> list[DocumentChunk]:
+        """All stored chunks (text and metadata, no embeddings)"""
+        stored = self.collection.get(include=["documents", "metadatas"])
+        return [
+            DocumentChunk(text=text, metadata=dict(metadata or {}))
+            for text, metadata in zip(stored["documents"], stored["metadatas"])
+        ]
+
+    def export_rows(self) -> tuple[list[str], list[str], list[dict], np.ndarray]:
+        """ids, texts, metadata and embeddings of every stored chunk"""
+        stored = self.collection.get(include=["documents", "metadatas", "embeddings"])
+        return (
+            list(stored["ids"]),
+            list(stored["documents"]),
+            [dict(metadata or {}) for metadata in stored["metadatas"]],
+            np.asarray(stored["embeddings"], dtype=np.float32)
+        )
+
+    def count(self) -> int:
+        """Number of documents in the collection"""
+        return self.collection.count()
+
+    def get_index_info(self) -> dict:
+        """Manifest entry of this collection (source hash, embedding model, ...)"""
+        return self.manifest.get(self.collection_name)
+
+    def record_index_info(self, **values) -> None:
+        """Record what the collection was built from in the index manifest"""
+        self.manifest.update(
+            self.collection_name,
+            embedding_model=self.embedder.name,
+            documents=self.count(),
+            **values
+        )
+        self._index_embedder = self.embedder.name
+
+    def is_current(self, source_hash: str) -> bool:
+        """Whether the index was built from this source with the configured embedding model"""
+        info = self.get_index_info()
+        return (
+            info.get("source_hash") == source_hash
+            and info.get("embedding_model") == self.embedder.name
+            and self.count() > 0
+        )
+
+    def _check_embedder(self) -> None:
+        """Refuse to mix vectors of two embedders in one collection"""
+        if self._index_embedder and self._index_embedder != self.embedder.name and self.count() > 0:
+            raise EmbedderMismatchError(
+                f"Collection {self.collection_name} was built with {self._index_embedder}, "
+                f"not {self.embedder.name}; rebuild() it first"
+            )
+
+    def _mark_embedder(self) -> None:
+        """Record the embedder as soon as the collection holds its vectors"""
+        if self._index_embedder != self.embedder.name:
+            self.manifest.update(self.collection_name, embedding_model=self.embedder.name)
+            self._index_embedder = self.embedder.name
+
+    def search(
+        self,
+        query: str,
+        n_results: int = 3,
+        layer_filter: str = None,
+        query_embedding: np.ndarray = None
+    ) -> list[dict]:
         """
         Search for similar documents.
 
@@ -60,6 +288,7 @@ class VectorStore:
             query: Natural language query
             n_results: Number of results to return
             layer_filter: Optional filter by layer (e.g., "Metal1")
+            query_embedding: Precomputed embedding of query (e.g. from a cache)
 
         Returns:
             List of results with text, metadata, and distance
@@ -70,8 +299,18 @@ class VectorStore:
         where = {"layer": layer_filter} if layer_filter else None
 
         # TODO 6: Query the collection
-        # Hint: self.collection.query(query_texts=[query], n_results=n_results, where=where)
-        results = self.collection.query(query_texts=[query], n_results=n_results, where=where)
+        # The query is embedded by the same embedder that built the collection
+        # Chroma rejects n_results=0 (e.g. min(depth, count()) on an empty collection)
+        if n_results <= 0 or self.count() == 0:
+            return []
+        self._check_embedder()
+        if query_embedding is None:
+            query_embedding = self.embedder.embed_query(query)
+        results = self.collection.query(
+            query_embeddings=[query_embedding],
+            n_results=n_results,
+            where=where
+        )
 
         # TODO 7: Format and return results
         # Return list of dicts with: text, metadata, distance
@@ -88,12 +327,79 @@ class VectorStore:
                 results["distances"][0]
             )
         ]
+
+    def search_many(
+        self,
+        queries: list[str],
+        n_results: int = 3,
+        layer_filter: str = None,
+        query_embeddings: np.ndarray = None
+    ) -> list[list[dict]]:
+        """
+        Search for several queries with a single collection query.
+
+        Args:
+            queries: Natural language queries
+            n_results: Number of results per query
+            layer_filter: Optional filter by layer (e.g., "Metal1")
+            query_embeddings: Precomputed embeddings, one row per query
+
+        Returns:
+            One result list per query, in input order
+        """
+        if not queries:
+            return []
+        if n_results <= 0 or self.count() == 0:
+            return [[] for _ in queries]
+
+        self._check_embedder()
+        if query_embeddings is None:
+            query_embeddings = self.embedder.embed(queries)
+        results = self.collection.query(
+            query_embeddings=list(query_embeddings),
+            n_results=n_results,
+            where={"layer": layer_filter} if layer_filter else None
+        )
+
+        return [
+            [
+                {"text": text, "metadata": metadata, "distance": distance}
+                for text, metadata, distance in zip(documents, metadatas, distances)
+            ]
+            for documents, metadatas, distances in zip(
+                results["documents"], results["metadatas"], results["distances"]
+            )
+        ]
+
     def clear(self) -> None:
         """Clear all documents from the collection."""
         # TODO 8: Delete the collection and recreate it
-        # Hint: self.client.delete_collection(self.collection.name)
+        self.client.delete_collection(self.collection_name)
+        self.collection = self.client.get_or_create_collection(name=self.collection_name)
+        self.manifest.remove(self.collection_name)
+        self._index_embedder = None
+
+    def rebuild(self, chunks: list[DocumentChunk]) -> dict:
+        """Clear the collection and index chunks from scratch"""
+        self.clear()
+        return self.sync_documents(chunks)
+
+
+def create_vector_store(config: VectorStoreConfig = None, collection_name: str = None):
+    """
+    Build the vector store selected by config.backend.
 
-        pass  # Remove this when you implement
+    Both backends share the same interface (add_documents, sync_documents,
+    search, clear, ...), so callers don't need to know which one they got.
+    """
+    config = config or VectorStoreConfig()
+    if config.backend == "numpy":
+        try:
+            from .numpy_store import NumpyVectorStore
+        except ImportError:
+            from numpy_store import NumpyVectorStore
+        return NumpyVectorStore(collection_name, config=config)
+    return VectorStore(collection_name, config=config)
 
 
 # Test function
@@ -0,0 +1,222 @@
+"""
+Fast-Path Router
+
+Answers deterministic design rule lookups without an LLM round trip.
+"What is the minimum width for Metal1?" maps to a single
+DesignRulesDB.query_rule() call, which takes microseconds instead of
+two messages.create() calls. Anything the router is not confident
+about falls through to the model, including questions that qualify the
+rule ("wide metal", "end-of-line", "to via"): the database holds one
+value per layer and rule type, so a qualified rule may be a different one.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from tools import BACKENDS, RAG_AVAILABLE
+from tools.design_rules import DesignRulesDB, format_rule_answer
+
+# Rule identifiers such as M1.W.1, PO.EX.1, VIA1.S.2
+RULE_ID_PATTERN = re.compile(r"\b([A-Z][A-Z0-9]*\.[A-Z]{1,2}\.\d+)\b", re.IGNORECASE)
+
+# Spoken layer names -> DesignRulesDB layer keys
+LAYER_ALIASES = {
+    "M1": r"\b(?:m1|metal\s*1)\b",
+    "M2": r"\b(?:m2|metal\s*2)\b",
+    "M3": r"\b(?:m3|metal\s*3)\b",
+    "POLY": r"\b(?:poly|polysilicon|gate\s+layer)\b",
+    "ACTIVE": r"\b(?:active|diffusion)\b",
+    "V0": r"\b(?:v0|via\s*0)\b",
+}
+
+# Keywords -> rule type (prefix, matched against the layer's rule names)
+RULE_TYPE_KEYWORDS = [
+    (r"\bdiff(?:erent)?[\s-]*nets?\b.*\bspacing\b|\bspacing\b.*\bdiff(?:erent)?[\s-]*nets?\b", "min_spacing_diffnet"),
+    (r"\bwidth\b", "min_width"),
+    (r"\bspacing\b|\bspace\b", "min_spacing"),
+    (r"\barea\b", "min_area"),
+    (r"\bextension\b|\bextend\b", "min_extension"),
+    (r"\benclos(?:ure|e)\b", "min_enclosure"),
+    (r"\bsize\b", "size"),
+]
+
+# Requests that need reasoning or generation always go to the model
+MODEL_ONLY_PATTERN = re.compile(
+    r"\b(?:generate|code|skill|netlist|analy[sz]e|why|how|explain|compare|all|list|should)\b",
+    re.IGNORECASE
+)
+
+# Questions that test a value of the user's ("Is 20nm enough?", "Can I use 10nm M1 width?")
+# need a comparison, not the bare rule value
+VALUE_CHECK_PATTERN = re.compile(
+    r"^\s*(?:is|are|can|could|does|do|will|would|may|must|am)\b"
+    r"|\b(?:larger|smaller|bigger|greater|less|more|than|enough|exceeds?|below|above|"
+    r"under|over|ok(?:ay)?|allowed|legal|valid|violat\w*)\b"
+    r"|\d+(?:\.\d+)?\s*(?:nm|um|µm|μm|mm)\b",
+    re.IGNORECASE
+)
+
+# Words that name the rule type (removed along with the layer before the leftover check)
+RULE_TYPE_WORDS = frozenset({
+    "width", "spacing", "space", "area", "extension", "extend", "enclosure", "enclose", "size",
+    "diff", "different", "net", "nets",
+})
+
+# Words a plain lookup may contain besides the layer and the rule type. Any
+# other word ("wide", "eol", "parallel", "corner", "straps") qualifies the
+# rule, so the question goes to the model.
+FILLER_WORDS = frozenset({
+    "a", "an", "the", "what", "what's", "whats", "which", "is", "of", "for", "on", "in", "at", "to",
+    "me", "please", "tell", "give", "show", "find", "get", "rule", "rules", "value",
+    "min", "minimum", "smallest", "required", "requirement", "layer",
+})
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+_LAYER_PATTERNS = {layer: re.compile(p, re.IGNORECASE) for layer, p in LAYER_ALIASES.items()}
+_RULE_TYPE_PATTERNS = [(re.compile(p, re.IGNORECASE), rule_type) for p, rule_type in RULE_TYPE_KEYWORDS]
+
+
+@dataclass
+class RouteResult:
+    """Answer produced without calling the model"""
+    answer: str
+    route: str      # "rule_id" or "layer_rule"
+    rule_id: str
+    source: str
+
+
+class FastPathRouter:
+    """
+    Pre-LLM router for high-confidence design rule lookups.
+
+    A question is answered locally only when it is short, asks for a
+    single value, and resolves to exactly one rule: either through an
+    explicit rule ID or through exactly one layer plus one rule type.
+    Yes/no questions and questions comparing a value of the user's go
+    to the model.
+    """
+
+    def __init__(self, db: Optional[DesignRulesDB] = None, retriever=None, max_question_chars: int = 160):
+        """
+        Args:
+            db: Design rules database (default: the shared "design_rules" backend)
+            retriever: RAG retriever with get_rule(rule_id), used for rule IDs
+                that DesignRulesDB doesn't know (default: the shared "rule_docs"
+                backend, loaded on the first such ID; none without the RAG dependencies)
+            max_question_chars: Longer questions always go to the model
+        """
+        self.db = db or BACKENDS.get("design_rules")
+        self._retriever = retriever
+        self.max_question_chars = max_question_chars
+        self.lookups = 0
+        self.hits = {"rule_id": 0, "layer_rule": 0}
+
+        # rule_id -> (layer, rule_type)
+        self._rule_ids = {
+            rule["rule_id"].upper(): (layer, rule_type)
+            for layer, layer_info in self.db.rules.items()
+            for rule_type, rule in layer_info["rules"].items()
+        }
+
+    @property
+    def retriever(self):
+        """Documentation retriever for unknown rule IDs (None if unavailable)"""
+        if self._retriever is None and RAG_AVAILABLE:
+            self._retriever = BACKENDS.get("rule_docs")
+        return self._retriever
+
+    def route(self, question: str) -> Optional[RouteResult]:
+        """
+        Try to answer a question locally.
+
+        Args:
+            question: User's message
+
+        Returns:
+            RouteResult, or None if the question should go to the model
+        """
+        self.lookups += 1
+        result = self._match(question)
+        if result:
+            self.hits[result.route] += 1
+        return result
+
+    def stats(self) -> dict:
+        """Lookup counters and hit rate"""
+        total_hits = sum(self.hits.values())
+        return {
+            "lookups": self.lookups,
+            "hits": total_hits,
+            "hits_by_route": dict(self.hits),
+            "hit_rate": total_hits / self.lookups if self.lookups else 0.0
+        }
+
+    def _match(self, question: str) -> Optional[RouteResult]:
+        if len(question) > self.max_question_chars or MODEL_ONLY_PATTERN.search(question):
+            return None
+        if VALUE_CHECK_PATTERN.search(question):
+            return None
+
+        rule_ids = {m.upper() for m in RULE_ID_PATTERN.findall(question)}
+        if len(rule_ids) > 1:
+            return None
+        if rule_ids:
+            return self._answer_rule_id(rule_ids.pop())
+
+        layers = [layer for layer, pattern in _LAYER_PATTERNS.items() if pattern.search(question)]
+        if len(layers) != 1:
+            return None
+
+        # First matching keyword wins; the diff-net pattern is listed before plain spacing
+        rule_type = next((rt for pattern, rt in _RULE_TYPE_PATTERNS if pattern.search(question)), None)
+        if rule_type is None:
+            return None
+
+        # Only the layer, the rule type and filler words may be left
+        remainder = _LAYER_PATTERNS[layers[0]].sub(" ", question.lower())
+        if any(word not in RULE_TYPE_WORDS and word not in FILLER_WORDS for word in WORD_PATTERN.findall(remainder)):
+            return None
+
+        candidates = [rt for rt in self.db.rules[layers[0]]["rules"] if rt.startswith(rule_type)]
+        if rule_type in candidates:
+            candidates = [rule_type]
+        if len(candidates) != 1:
+            return None
+
+        return self._answer_db_rule(layers[0], candidates[0], route="layer_rule")
+
+    def _answer_rule_id(self, rule_id: str) -> Optional[RouteResult]:
+        if rule_id in self._rule_ids:
+            layer, rule_type = self._rule_ids[rule_id]
+            return self._answer_db_rule(layer, rule_type, route="rule_id")
+
+        if self.retriever is None:
+            return None
+
+        # Only accept an exact ID match from the documentation index
+        hit = self.retriever.get_rule(rule_id)
+        if not hit or hit["metadata"].get("rule_id", "").upper() != rule_id:
+            return None
+
+        metadata = hit["metadata"]
+        return RouteResult(
+            answer=f"Rule {metadata['rule_id']} ({metadata.get('layer', 'N/A')}): "
+                   f"{metadata.get('value', 'N/A')}.\n\n{hit['text']}",
+            route="rule_id",
+            rule_id=metadata["rule_id"],
+            source=metadata.get("source", "design rule manual")
+        )
+
+    def _answer_db_rule(self, layer: str, rule_type: str, route: str) -> Optional[RouteResult]:
+        rule = self.db.query_rule(layer, rule_type)
+        if rule["status"] != "success":
+            return None
+
+        return RouteResult(
+            answer=format_rule_answer(rule),
+            route=route,
+            rule_id=rule["rule_id"],
+            source=rule["source"]
+        )
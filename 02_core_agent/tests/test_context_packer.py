@@ -0,0 +1,39 @@
+"""Tests for the context packer"""
+
+from rag.context_packer import EMPTY_CONTEXT, ContextPacker
+
+
+def rule_result(rule_id, distance, description="Shapes must respect the rule.", layer="Metal1"):
+    return {
+        "text": f"{rule_id} - Rule\nLayer: {layer}\nDescription: {description}",
+        "metadata": {"rule_id": rule_id, "layer": layer, "value": "18nm", "description": description},
+        "distance": distance,
+    }
+
+
+def test_far_results_are_dropped():
+    packed = ContextPacker(max_distance=0.5).pack([rule_result("M1.W.1", 0.8)])
+
+    assert packed.text == EMPTY_CONTEXT
+    assert packed.dropped == {"distance": 1}
+
+
+def test_rule_named_in_question_survives_distance_filter():
+    results = [rule_result("M1.S.2", 0.2), rule_result("V0.SZ.1", 0.95, layer="V0")]
+
+    packed = ContextPacker(max_distance=0.5).pack(results, question="What does V0.SZ.1 require?")
+
+    assert packed.included == ["M1.S.2", "V0.SZ.1"]
+    assert "distance" not in packed.dropped
+
+
+def test_duplicates_and_budget():
+    results = [rule_result("M1.W.1", 0.1), rule_result("M1.W.1", 0.1)]
+    results += [rule_result(f"M2.W.{i}", 0.3, description="word " * 60) for i in range(10)]
+
+    packed = ContextPacker(token_budget=120).pack(results)
+
+    assert packed.included[0] == "M1.W.1"
+    assert packed.dropped["duplicate"] == 1
+    assert packed.dropped["budget"] > 0
+    assert packed.tokens <= 120
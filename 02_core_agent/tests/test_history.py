@@ -0,0 +1,46 @@
+"""Tests for conversation history compaction"""
+
+from history import ELIDED_MARKER, SUMMARY_HEADER, HistoryManager, estimate_tokens
+
+
+def tool_turn(index, payload_chars=4000):
+    tool_id = f"toolu_{index}"
+    return [
+        {"role": "user", "content": f"Question {index}: check the netlist"},
+        {"role": "assistant", "content": [{"type": "tool_use", "id": tool_id, "name": "analyze_circuit", "input": {}}]},
+        {"role": "user", "content": [{"type": "tool_result", "tool_use_id": tool_id, "content": "x" * payload_chars}]},
+        {"role": "assistant", "content": [{"type": "text", "text": f"Answer {index}"}]},
+    ]
+
+
+def test_small_history_is_returned_unchanged():
+    messages = tool_turn(0, payload_chars=10)
+    assert HistoryManager(token_budget=1000).compact(messages) is messages
+
+
+def test_old_tool_results_are_elided_first():
+    messages = [m for i in range(4) for m in tool_turn(i)]
+    manager = HistoryManager(token_budget=4000, keep_recent_turns=2, target_ratio=1.0)
+
+    compacted = manager.compact(messages)
+
+    old_result = compacted[2]["content"][0]["content"]
+    assert ELIDED_MARKER in old_result and "analyze_circuit" in old_result
+    assert compacted[-2]["content"][0]["content"] == "x" * 4000
+    assert manager.compactions == 1
+
+
+def test_old_turns_collapse_into_a_summary_and_pairs_stay_valid():
+    messages = [m for i in range(6) for m in tool_turn(i)]
+    manager = HistoryManager(token_budget=2000, keep_recent_turns=2)
+
+    compacted = manager.compact(messages)
+
+    assert compacted[0]["content"].startswith(SUMMARY_HEADER)
+    assert "Question 0" in compacted[0]["content"]
+    assert estimate_tokens(compacted) < estimate_tokens(messages)
+    # Every tool_result still follows the assistant message with its tool_use
+    for previous, message in zip(compacted, compacted[1:]):
+        if isinstance(message["content"], list) and message["content"][0]["type"] == "tool_result":
+            assert previous["content"][0]["id"] == message["content"][0]["tool_use_id"]
+    assert compacted[-4]["content"] == "Question 5: check the netlist"
@@ -0,0 +1,43 @@
+"""Tests for rag/ingest.py chunking"""
+
+from rag.ingest import chunk_file
+
+DRM_RULE = """M1.W.1 - Minimum Width
+Layer: Metal1
+Value: 18nm
+Description: All Metal1 shapes must have minimum width of 18nm.
+"""
+
+
+def test_free_text_with_numbered_heading_is_not_drm(tmp_path):
+    path = tmp_path / "lvs_notes.txt"
+    path.write_text("LVS setup notes for the ASAP7 flow.\n\n1.1 - Overview\nRun LVS after every ECO.\n")
+
+    chunks = chunk_file(str(path), str(tmp_path))
+
+    assert all(chunk.metadata["doc_type"] == "text" for chunk in chunks)
+    assert all("rule_id" not in chunk.metadata for chunk in chunks)
+    text = "\n".join(chunk.text for chunk in chunks)
+    assert "LVS setup notes" in text
+    assert "Run LVS after every ECO." in text
+
+
+def test_mixed_file_keeps_text_between_rules(tmp_path):
+    path = tmp_path / "mixed.txt"
+    path.write_text(
+        "Introduction to the Metal1 rules.\n\n"
+        + DRM_RULE
+        + "---\n"
+        + "Note: wide-metal rules follow.\n\n"
+        + "M1.S.1 - Minimum Spacing\nLayer: Metal1\nValue: 18nm\n"
+    )
+
+    chunks = chunk_file(str(path), str(tmp_path))
+
+    assert [c.metadata["chunk_id"] for c in chunks] == [
+        "mixed.txt#0", "mixed.txt::M1.W.1", "mixed.txt#1", "mixed.txt::M1.S.1"
+    ]
+    assert chunks[1].metadata["doc_type"] == "drm"
+    assert chunks[1].metadata["value"] == "18nm"
+    assert "wide-metal rules follow" in chunks[2].text
+    assert chunks[2].metadata["doc_type"] == "text"
@@ -0,0 +1,36 @@
+"""Tests for layer detection"""
+
+import pytest
+
+from rag.layer_detector import EXPLICIT_CONFIDENCE, SYNONYM_CONFIDENCE, LayerDetector
+
+
+@pytest.fixture
+def detector():
+    return LayerDetector(["Metal1", "Metal2", "VIA1", "Poly"], {"M1": "Metal1", "PO": "Poly"})
+
+
+@pytest.mark.parametrize("question, layer", [
+    ("minimum width of Metal1", "Metal1"),
+    ("metal 2 spacing", "Metal2"),
+    ("What does M1.S.1 say?", "Metal1"),
+    ("v1 enclosure", "VIA1"),
+])
+def test_explicit_names(detector, question, layer):
+    guess = detector.detect(question)
+    assert (guess.layer, guess.confidence) == (layer, EXPLICIT_CONFIDENCE)
+
+
+def test_synonym_is_weaker_evidence(detector):
+    guess = detector.detect("gate extension past active")
+    assert (guess.layer, guess.confidence) == ("Poly", SYNONYM_CONFIDENCE)
+
+
+def test_several_layers_are_ambiguous(detector):
+    guess = detector.detect("Metal1 to Metal2 via rules")
+    assert guess.confidence == EXPLICIT_CONFIDENCE / 2
+
+
+def test_no_layer_and_no_partial_words(detector):
+    assert detector.detect("How do I run LVS?").layer is None
+    assert detector.detect("m10 spacing").layer is None
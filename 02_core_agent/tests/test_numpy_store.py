@@ -0,0 +1,59 @@
+"""Tests for the NumPy vector store"""
+
+import pytest
+
+from rag import numpy_store
+from rag.config import VectorStoreConfig
+from rag.document_loader import DocumentChunk
+from rag.numpy_store import NumpyVectorStore, current_generation
+
+
+def make_chunk(rule_id, layer, text):
+    return DocumentChunk(text=text, metadata={"rule_id": rule_id, "layer": layer})
+
+
+@pytest.fixture
+def config(tmp_path):
+    return VectorStoreConfig(index_dir=tmp_path, backend="numpy", embedding_model="hashing")
+
+
+def test_interrupted_save_keeps_the_previous_index(config, monkeypatch):
+    store = NumpyVectorStore("rules", config)
+    store.sync_documents([make_chunk("M1.W.1", "Metal1", "Metal1 minimum width 18nm")])
+
+    def crash(*args, **kwargs):
+        raise OSError("disk full")
+
+    # Both files of the new generation are written, the pointer is never switched
+    monkeypatch.setattr(numpy_store, "publish_generation", crash)
+    with pytest.raises(OSError):
+        store.sync_documents([
+            make_chunk("M1.W.1", "Metal1", "Metal1 minimum width 18nm"),
+            make_chunk("M2.W.1", "Metal2", "Metal2 minimum width 20nm"),
+        ])
+
+    reader = NumpyVectorStore("rules", config)
+    assert reader.count() == 1
+    assert len(reader.embeddings) == len(reader.ids)
+    assert reader.search("Metal1 width", n_results=1)[0]["metadata"]["rule_id"] == "M1.W.1"
+
+
+def test_save_switches_generation(config):
+    store = NumpyVectorStore("rules", config)
+    store.sync_documents([make_chunk("M1.W.1", "Metal1", "Metal1 minimum width 18nm")])
+    first = current_generation(store.path)
+    store.upsert_documents([make_chunk("M2.W.1", "Metal2", "Metal2 minimum width 20nm")])
+
+    assert current_generation(store.path) == first + 1
+    reader = NumpyVectorStore("rules", config)
+    assert sorted(m["rule_id"] for m in reader.metadatas) == ["M1.W.1", "M2.W.1"]
+    assert reader.layer_sizes() == {"Metal1": 1, "Metal2": 1}
+
+
+def test_clear_removes_all_generations(config):
+    store = NumpyVectorStore("rules", config)
+    store.sync_documents([make_chunk("M1.W.1", "Metal1", "Metal1 minimum width 18nm")])
+    store.clear()
+
+    assert store.count() == 0
+    assert NumpyVectorStore("rules", config).count() == 0
@@ -0,0 +1,47 @@
+"""Tests for the fast-path router"""
+
+import pytest
+
+from router import FastPathRouter
+
+
+class NoDocsRetriever:
+    """Retriever stub: the documentation index knows no extra rules"""
+
+    def get_rule(self, rule_id):
+        return None
+
+
+@pytest.fixture
+def router():
+    return FastPathRouter(retriever=NoDocsRetriever())
+
+
+@pytest.mark.parametrize("question, rule_id", [
+    ("What is the minimum width for Metal1?", "M1.W.1"),
+    ("min M1 spacing", "M1.S.1"),
+    ("What's the M1 spacing for different nets?", "M1.S.2"),
+    ("What is M1.W.1?", "M1.W.1"),
+])
+def test_plain_lookups_take_the_fast_path(router, question, rule_id):
+    result = router.route(question)
+    assert result is not None
+    assert result.rule_id == rule_id
+
+
+@pytest.mark.parametrize("question", [
+    "What is the spacing rule for wide metal on M1?",
+    "Metal1 width for power straps (wide metal)",
+    "M1 EOL spacing",
+    "What is the M1 spacing at a corner?",
+    "M1 spacing to via",
+    "Is 20nm enough for M1 spacing?",
+    "Explain the M1 width rule",
+])
+def test_qualified_questions_go_to_the_model(router, question):
+    assert router.route(question) is None
+
+
+def test_unknown_rule_id_goes_to_the_model(router):
+    assert router.route("What is M9.W.1?") is None
+    assert router.stats()["hits"] == 0
@@ -0,0 +1,60 @@
+"""Tests for the shared, generation-published index"""
+
+import pytest
+
+from rag.config import VectorStoreConfig
+from rag.document_loader import DocumentChunk
+from rag.numpy_store import NumpyVectorStore
+from rag.shared_index import SharedIndexStore, current_generation, publish_index
+
+
+def make_chunk(rule_id, layer, text):
+    return DocumentChunk(text=text, metadata={"rule_id": rule_id, "layer": layer, "value": "18nm"})
+
+
+@pytest.fixture
+def owner(tmp_path):
+    config = VectorStoreConfig(index_dir=tmp_path / "index", backend="numpy", embedding_model="hashing")
+    store = NumpyVectorStore("rules", config)
+    store.sync_documents([
+        make_chunk("M1.W.1", "Metal1", "Metal1 minimum width 18nm"),
+        make_chunk("M1.S.1", "Metal1", "Metal1 minimum spacing 18nm"),
+    ])
+    return store
+
+
+def test_reader_sees_the_published_rows(owner, tmp_path):
+    root = tmp_path / "shared"
+    publish_index(owner, root)
+    reader = SharedIndexStore(root, owner.embedder)
+
+    bm25, rules, _ = reader.indexes()
+    assert reader.count() == 2
+    assert rules.get("m1.s.1")["metadata"]["rule_id"] == "M1.S.1"
+    assert bm25.search("spacing", n_results=1)[0]["metadata"]["rule_id"] == "M1.S.1"
+    assert reader.search("Metal1 width", n_results=1, layer_filter="Metal1")[0]["metadata"]["rule_id"] == "M1.W.1"
+
+
+def test_reader_follows_a_generation_change(owner, tmp_path):
+    root = tmp_path / "shared"
+    publish_index(owner, root)
+    reader = SharedIndexStore(root, owner.embedder, check_interval=0)
+    old_rules = reader.indexes()[1]
+
+    owner.upsert_documents([make_chunk("M2.W.1", "Metal2", "Metal2 minimum width 20nm")])
+    publish_index(owner, root)
+    publish_index(owner, root)
+
+    assert reader.check() == current_generation(root) == 3
+    assert reader.count() == 3
+    assert reader.indexes()[1].get("M2.W.1")["metadata"]["layer"] == "Metal2"
+    # Indexes taken before the swap keep answering from their generation
+    assert old_rules.get("M2.W.1") is None
+    assert old_rules.get("M1.W.1")["metadata"]["rule_id"] == "M1.W.1"
+    assert sorted(path.name for path in root.glob("gen-*")) == ["gen-000002", "gen-000003"]
+
+
+def test_read_only(owner, tmp_path):
+    publish_index(owner, tmp_path / "shared")
+    with pytest.raises(RuntimeError):
+        SharedIndexStore(tmp_path / "shared", owner.embedder).rebuild([])
@@ -4,10 +4,20 @@ EDA Copilot Tools
 This module exports all available tools for the agent.
 """
 
+import asyncio
+import json
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import ToolResultCache, make_cache_key
+from .registry import BACKENDS
+
 from .skill_generator import (
     SkillGenerator,
     SKILL_GENERATOR_TOOL,
-    handle_tool_call as handle_skill_generator
+    handle_tool_call as handle_skill_generator,
+    ahandle_tool_call as ahandle_skill_generator,
+    format_tool_result as format_skill_result
 )
 
 from .circuit_analyzer import (
@@ -23,9 +33,24 @@ from .design_rules import (
     LIST_DESIGN_RULES_TOOL,
     handle_query_tool,
     handle_search_tool,
-    handle_list_tool
+    handle_list_tool,
+    format_query_result
 )
 
+# Documentation search needs the optional RAG dependencies (chromadb)
+try:
+    from rag.retriever import (
+        DesignRuleRetriever,
+        QUERY_DOCUMENTATION_TOOL,
+        QUERY_DOCUMENTATION_BATCH_TOOL,
+        get_retriever,
+        handle_query_documentation,
+        handle_query_documentation_batch
+    )
+    RAG_AVAILABLE = True
+except ImportError:
+    RAG_AVAILABLE = False
+
 # All available tools for the agent
 ALL_TOOLS = [
     SKILL_GENERATOR_TOOL,
@@ -45,19 +70,225 @@ TOOL_HANDLERS = {
 }
 
 
-def execute_tool(tool_name: str, tool_input: dict) -> str:
+def _rule_docs_backend() -> "DesignRuleRetriever":
+    retriever = get_retriever()
+    # Cached documentation results must not outlive an index refresh
+    retriever.add_change_listener(_clear_tool_cache)
+    return retriever
+
+
+if RAG_AVAILABLE:
+    # The retriever loads and embeds the DRM once, then serves every call
+    BACKENDS.register("rule_docs", _rule_docs_backend)
+    ALL_TOOLS.append(QUERY_DOCUMENTATION_TOOL)
+    ALL_TOOLS.append(QUERY_DOCUMENTATION_BATCH_TOOL)
+    TOOL_HANDLERS["query_documentation"] = lambda tool_input: handle_query_documentation(
+        tool_input, retriever=BACKENDS.get("rule_docs")
+    )
+    TOOL_HANDLERS["query_documentation_batch"] = lambda tool_input: handle_query_documentation_batch(
+        tool_input, retriever=BACKENDS.get("rule_docs")
+    )
+
+# Native async handlers; tools not listed here run in a worker thread
+ASYNC_TOOL_HANDLERS = {
+    "generate_skill_code": ahandle_skill_generator,
+}
+
+# Tools whose result can be the complete answer. The formatter turns the
+# JSON result into user-facing text, or returns None if it isn't terminal.
+TERMINAL_FORMATTERS = {
+    "generate_skill_code": format_skill_result,
+    "query_design_rule": format_query_result,
+}
+
+# Result cache lifetime per tool in seconds; None marks a tool non-cacheable.
+# Generation tools are non-cacheable: asking again should give a new answer.
+TOOL_CACHE_TTLS = {
+    "generate_skill_code": None,
+    "analyze_circuit": 600,
+    "query_design_rule": 3600,
+    "search_design_rules": 3600,
+    "list_design_rules": 3600,
+    "query_documentation": 3600,
+    "query_documentation_batch": 3600,
+}
+
+# Process-wide cache shared by all sessions
+TOOL_CACHE = ToolResultCache(max_entries=512)
+
+
+def _clear_tool_cache(*_) -> None:
+    TOOL_CACHE.clear()
+
+
+# Results computed by a reloaded backend may differ: start over
+BACKENDS.add_reload_listener(_clear_tool_cache)
+
+# Default number of tools allowed to run at the same time within one turn
+DEFAULT_MAX_PARALLEL_TOOLS = 4
+
+
+def is_cacheable(tool_name: str) -> bool:
+    """Whether results of this tool may be served from TOOL_CACHE"""
+    return TOOL_CACHE_TTLS.get(tool_name) is not None
+
+
+def format_terminal_result(tool_name: str, result: str) -> Optional[str]:
+    """
+    Format a tool result as a final answer, if the tool declares it terminal.
+
+    Args:
+        tool_name: Name of the tool that produced the result
+        result: JSON result string
+
+    Returns:
+        User-facing answer text, or None if the result needs the model
+    """
+    formatter = TERMINAL_FORMATTERS.get(tool_name)
+    if formatter is None:
+        return None
+    try:
+        return formatter(result)
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def execute_tool(tool_name: str, tool_input: dict, use_cache: bool = True) -> str:
     """
     Execute a tool by name with the given input.
 
     Args:
         tool_name: Name of the tool to execute
         tool_input: Input parameters for the tool
+        use_cache: Serve cacheable tools from TOOL_CACHE
 
     Returns:
         JSON string with tool results
     """
     if tool_name not in TOOL_HANDLERS:
-        import json
         return json.dumps({"error": f"Unknown tool: {tool_name}"})
 
-    return TOOL_HANDLERS[tool_name](tool_input)
+    cacheable = use_cache and is_cacheable(tool_name)
+    if cacheable:
+        cached = TOOL_CACHE.get(tool_name, tool_input)
+        if cached is not None:
+            return cached
+
+    result = TOOL_HANDLERS[tool_name](tool_input)
+
+    if cacheable:
+        TOOL_CACHE.put(tool_name, tool_input, result, ttl=TOOL_CACHE_TTLS[tool_name])
+    return result
+
+
+def _dedupe_calls(tool_calls: list[tuple[str, dict]]) -> tuple[list[tuple[str, dict]], list[int]]:
+    """
+    Collapse identical calls of one turn.
+
+    Returns:
+        (unique calls, index into the unique calls for every original call)
+    """
+    unique = []
+    positions = {}
+    mapping = []
+    for name, tool_input in tool_calls:
+        key = make_cache_key(name, tool_input)
+        if key not in positions:
+            positions[key] = len(unique)
+            unique.append((name, tool_input))
+        mapping.append(positions[key])
+    return unique, mapping
+
+
+def execute_tools(tool_calls: list[tuple[str, dict]], max_workers: int = DEFAULT_MAX_PARALLEL_TOOLS) -> list[str]:
+    """
+    Execute several independent tools concurrently.
+
+    All calls of a turn are dispatched together on a thread pool, so a
+    multi-tool turn takes about as long as its slowest tool. Identical
+    calls are executed only once.
+
+    Args:
+        tool_calls: List of (tool_name, tool_input) pairs
+        max_workers: Maximum number of tools running at the same time
+
+    Returns:
+        List of JSON result strings, in the same order as tool_calls
+    """
+    def run(call: tuple[str, dict]) -> str:
+        name, tool_input = call
+        try:
+            return execute_tool(name, tool_input)
+        except Exception as e:
+            # One failing tool must not take down the rest of the turn
+            return json.dumps({"status": "error", "error": f"{name} failed: {e}"})
+
+    unique, mapping = _dedupe_calls(tool_calls)
+
+    if len(unique) <= 1 or max_workers <= 1:
+        results = [run(call) for call in unique]
+    else:
+        workers = min(max_workers, len(unique))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="eda-tool") as pool:
+            # map() yields results in submission order
+            results = list(pool.map(run, unique))
+
+    return [results[i] for i in mapping]
+
+
+async def aexecute_tool(tool_name: str, tool_input: dict, use_cache: bool = True) -> str:
+    """
+    Async version of execute_tool().
+
+    Tools with a native async handler are awaited directly; the others
+    run in a worker thread so they never block the event loop.
+
+    Args:
+        tool_name: Name of the tool to execute
+        tool_input: Input parameters for the tool
+        use_cache: Serve cacheable tools from TOOL_CACHE
+
+    Returns:
+        JSON string with tool results
+    """
+    if tool_name not in ASYNC_TOOL_HANDLERS:
+        return await asyncio.to_thread(execute_tool, tool_name, tool_input, use_cache)
+
+    cacheable = use_cache and is_cacheable(tool_name)
+    if cacheable:
+        cached = TOOL_CACHE.get(tool_name, tool_input)
+        if cached is not None:
+            return cached
+
+    result = await ASYNC_TOOL_HANDLERS[tool_name](tool_input)
+
+    if cacheable:
+        TOOL_CACHE.put(tool_name, tool_input, result, ttl=TOOL_CACHE_TTLS[tool_name])
+    return result
+
+
+async def aexecute_tools(tool_calls: list[tuple[str, dict]], max_concurrency: int = DEFAULT_MAX_PARALLEL_TOOLS) -> list[str]:
+    """
+    Async version of execute_tools().
+
+    Args:
+        tool_calls: List of (tool_name, tool_input) pairs
+        max_concurrency: Maximum number of tools running at the same time
+
+    Returns:
+        List of JSON result strings, in the same order as tool_calls
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(name: str, tool_input: dict) -> str:
+        async with semaphore:
+            try:
+                return await aexecute_tool(name, tool_input)
+            except Exception as e:
+                return json.dumps({"status": "error", "error": f"{name} failed: {e}"})
+
+    unique, mapping = _dedupe_calls(tool_calls)
+
+    # gather() returns results in argument order
+    results = await asyncio.gather(*(run(name, tool_input) for name, tool_input in unique))
+    return [results[i] for i in mapping]
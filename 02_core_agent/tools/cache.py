@@ -0,0 +1,85 @@
+"""
+Tool Result Cache
+
+Memoizes tool results so repeated lookups (same design rule, same
+netlist) are served without recomputing them.
+Entries are keyed on tool name + canonicalized input, expire after a
+per-tool TTL and are evicted least-recently-used beyond a size cap.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+def make_cache_key(tool_name: str, tool_input: dict) -> str:
+    """Canonical key: key order and whitespace in the input don't matter"""
+    return tool_name + ":" + json.dumps(tool_input, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class ToolResultCache:
+    """
+    Thread-safe LRU cache with per-entry expiry.
+
+    Tool calls of a turn run on a thread pool, so all access is locked.
+    """
+
+    def __init__(self, max_entries: int = 512, default_ttl: float = 3600.0):
+        """
+        Args:
+            max_entries: Maximum number of cached results (LRU eviction)
+            default_ttl: Lifetime in seconds when put() gets no TTL
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, tool_name: str, tool_input: dict) -> Optional[str]:
+        """Return the cached result, or None on a miss or expired entry"""
+        key = make_cache_key(tool_name, tool_input)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, tool_name: str, tool_input: dict, result: str, ttl: Optional[float] = None) -> None:
+        """Store a result, evicting the least recently used entries if full"""
+        key = make_cache_key(tool_name, tool_input)
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_entries": self.max_entries
+            }
@@ -10,6 +10,11 @@ import re
 from dataclasses import dataclass
 from typing import Optional
 
+try:
+    from .registry import BACKENDS
+except ImportError:
+    from registry import BACKENDS
+
 
 @dataclass
 class Device:
@@ -191,6 +196,9 @@ class CircuitAnalyzer:
         }
 
 
+BACKENDS.register("circuit_analyzer", CircuitAnalyzer)
+
+
 # Tool definition for agent integration
 CIRCUIT_ANALYZER_TOOL = {
     "name": "analyze_circuit",
@@ -210,7 +218,7 @@ CIRCUIT_ANALYZER_TOOL = {
 
 def handle_tool_call(tool_input: dict) -> str:
     """Handler for agent tool calls"""
-    analyzer = CircuitAnalyzer()
+    analyzer = BACKENDS.get("circuit_analyzer")
     analysis = analyzer.analyze(tool_input["netlist"])
     return json.dumps(analyzer.to_dict(analysis), indent=2)
 
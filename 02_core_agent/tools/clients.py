@@ -0,0 +1,109 @@
+"""
+Shared Anthropic Clients
+
+Process-wide Claude clients with connection pooling and keep-alive.
+The agent, SkillGenerator and explain_code all use these, so tool calls
+reuse warm TCP/TLS connections instead of building a new client (and
+new connections) on every invocation.
+"""
+
+import asyncio
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Optional
+
+import anthropic
+
+# Connection limits class of the HTTP library the SDK is built on
+_Limits = type(anthropic.DEFAULT_CONNECTION_LIMITS)
+
+
+@dataclass
+class ClientConfig:
+    """Connection pool and timeout settings for the shared clients"""
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0     # seconds an idle connection stays open
+    timeout: float = 120.0             # total request timeout in seconds
+    connect_timeout: float = 5.0
+    max_retries: int = 2
+
+
+_config = ClientConfig()
+_lock = threading.Lock()
+_client: Optional[anthropic.Anthropic] = None
+# Async connections belong to the event loop that opened them: one client per loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, anthropic.AsyncAnthropic]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def configure_clients(config: ClientConfig) -> None:
+    """
+    Set pool size and timeouts for the shared clients.
+
+    Existing clients are closed; the next get_client()/get_async_client()
+    call builds new ones with the new settings.
+    """
+    global _config
+    close_clients()
+    with _lock:
+        _config = config
+
+
+def _client_options() -> dict:
+    return {
+        "timeout": anthropic.Timeout(_config.timeout, connect=_config.connect_timeout),
+        "max_retries": _config.max_retries,
+    }
+
+
+def _limits() -> object:
+    return _Limits(
+        max_connections=_config.max_connections,
+        max_keepalive_connections=_config.max_keepalive_connections,
+        keepalive_expiry=_config.keepalive_expiry,
+    )
+
+
+def get_client() -> anthropic.Anthropic:
+    """Shared synchronous client (created on first use)"""
+    global _client
+    with _lock:
+        if _client is None:
+            _client = anthropic.Anthropic(
+                http_client=anthropic.DefaultHttpxClient(limits=_limits()),
+                **_client_options()
+            )
+        return _client
+
+
+def get_async_client() -> anthropic.AsyncAnthropic:
+    """
+    Shared async client for the running event loop.
+
+    Must be called from inside a coroutine.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            client = anthropic.AsyncAnthropic(
+                http_client=anthropic.DefaultAsyncHttpxClient(limits=_limits()),
+                **_client_options()
+            )
+            _async_clients[loop] = client
+        return client
+
+
+def close_clients() -> None:
+    """Close the shared synchronous client and forget all async clients"""
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+        # Async clients can only be closed on their own loop; dropping the
+        # reference lets them be garbage collected with it
+        _async_clients.clear()
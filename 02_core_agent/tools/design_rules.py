@@ -8,6 +8,11 @@ Demonstrates RAG-like retrieval for EDA documentation.
 import json
 from typing import Optional
 
+try:
+    from .registry import BACKENDS
+except ImportError:
+    from registry import BACKENDS
+
 
 # Simulated ASAP7 Design Rules Database
 # In production, this would be loaded from PDK files or parsed from DRM PDFs
@@ -229,6 +234,10 @@ class DesignRulesDB:
         return summary
 
 
+# Shared by all design rule handlers
+BACKENDS.register("design_rules", DesignRulesDB)
+
+
 # Tool definitions for agent integration
 QUERY_DESIGN_RULE_TOOL = {
     "name": "query_design_rule",
@@ -275,23 +284,43 @@ LIST_DESIGN_RULES_TOOL = {
 }
 
 
+def format_rule_answer(rule: dict) -> str:
+    """One-line answer for a successful query_rule() result"""
+    return (f"{rule['description']}: {rule['value']} (rule {rule['rule_id']}, "
+            f"{rule['layer_name']}).\nSource: {rule['source']}")
+
+
+def format_query_result(result: str) -> Optional[str]:
+    """
+    Terminal formatter for query_design_rule.
+
+    A single rule value is already a complete answer, so the agent can
+    return it without asking Claude to rephrase it. Errors are not
+    terminal: Claude should explain them and suggest alternatives.
+    """
+    rule = json.loads(result)
+    if rule.get("status") != "success":
+        return None
+    return format_rule_answer(rule)
+
+
 def handle_query_tool(tool_input: dict) -> str:
     """Handler for query_design_rule tool"""
-    db = DesignRulesDB()
+    db = BACKENDS.get("design_rules")
     result = db.query_rule(tool_input["layer"], tool_input["rule_type"])
     return json.dumps(result, indent=2)
 
 
 def handle_search_tool(tool_input: dict) -> str:
     """Handler for search_design_rules tool"""
-    db = DesignRulesDB()
+    db = BACKENDS.get("design_rules")
     results = db.search_rules(tool_input["query"])
     return json.dumps({"results": results, "count": len(results)}, indent=2)
 
 
 def handle_list_tool(tool_input: dict) -> str:
     """Handler for list_design_rules tool"""
-    db = DesignRulesDB()
+    db = BACKENDS.get("design_rules")
     summary = db.list_all_rules()
     return json.dumps(summary, indent=2)
 
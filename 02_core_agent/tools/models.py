@@ -0,0 +1,15 @@
+"""
+Model Configuration
+
+Claude models shared by the agent and the tools.
+Override with the EDA_COPILOT_FAST_MODEL / EDA_COPILOT_STRONG_MODEL
+environment variables.
+"""
+
+import os
+
+# Small, low-latency model: tool selection and short rule answers
+FAST_MODEL = os.getenv("EDA_COPILOT_FAST_MODEL", "claude-3-5-haiku-20241022")
+
+# Larger model: SKILL generation and circuit analysis
+STRONG_MODEL = os.getenv("EDA_COPILOT_STRONG_MODEL", "claude-sonnet-4-20250514")
@@ -0,0 +1,101 @@
+"""
+Tool Backend Registry
+
+Owns the long-lived objects behind the tool handlers (rule database,
+circuit analyzer, SKILL generator, documentation retriever).
+Each backend is created once, lazily and thread-safely, and reused by
+every call, so per-call setup cost drops to zero.
+
+Lifecycle hooks:
+- warmup(): create backends ahead of the first request
+- reload(): rebuild a backend, e.g. after the PDK data changed
+- close(): release backends (calls their close() method if they have one)
+"""
+
+import threading
+from typing import Any, Callable, Optional
+
+
+class BackendRegistry:
+    """Lazily initialized, thread-safe singleton backends by name"""
+
+    def __init__(self):
+        self._factories: dict[str, Callable[[], Any]] = {}
+        self._instances: dict[str, Any] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+        self._reload_listeners: list[Callable[[str], None]] = []
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        """
+        Register a backend factory. The backend is built on first use.
+
+        Args:
+            name: Backend name used by get()
+            factory: Zero-argument callable creating the backend
+        """
+        with self._registry_lock:
+            self._factories[name] = factory
+            self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str) -> Any:
+        """Return the backend, creating it on first use"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        if name not in self._factories:
+            raise KeyError(f"Unknown tool backend: {name}")
+
+        # Per-backend lock: a slow backend (e.g. embedding a document index)
+        # doesn't block the first use of the others
+        with self._locks[name]:
+            instance = self._instances.get(name)
+            if instance is None:
+                instance = self._factories[name]()
+                self._instances[name] = instance
+            return instance
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether the backend has been created"""
+        return name in self._instances
+
+    def names(self) -> list[str]:
+        """Names of all registered backends"""
+        return list(self._factories)
+
+    def warmup(self, names: Optional[list[str]] = None) -> None:
+        """Create backends now instead of on the first tool call"""
+        for name in names or self.names():
+            self.get(name)
+
+    def reload(self, name: str) -> Any:
+        """Close and rebuild a backend; notifies reload listeners"""
+        with self._locks[name]:
+            self._close_instance(name)
+            instance = self._factories[name]()
+            self._instances[name] = instance
+
+        for listener in self._reload_listeners:
+            listener(name)
+        return instance
+
+    def add_reload_listener(self, listener: Callable[[str], None]) -> None:
+        """Call listener(name) after a backend was reloaded"""
+        self._reload_listeners.append(listener)
+
+    def close(self, name: Optional[str] = None) -> None:
+        """Close one backend, or all of them"""
+        for backend in [name] if name else self.names():
+            with self._locks[backend]:
+                self._close_instance(backend)
+
+    def _close_instance(self, name: str) -> None:
+        instance = self._instances.pop(name, None)
+        close = getattr(instance, "close", None)
+        if callable(close):
+            close()
+
+
+# Process-wide registry used by all tool handlers
+BACKENDS = BackendRegistry()
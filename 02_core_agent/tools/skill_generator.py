@@ -9,6 +9,15 @@ import anthropic
 from typing import Optional
 import json
 
+try:
+    from .clients import get_async_client, get_client
+    from .models import STRONG_MODEL
+    from .registry import BACKENDS
+except ImportError:
+    from clients import get_async_client, get_client
+    from models import STRONG_MODEL
+    from registry import BACKENDS
+
 # SKILL code templates for common patterns
 SKILL_TEMPLATES = {
     "iterate_instances": '''procedure({func_name}(libName cellName viewName)
@@ -66,9 +75,24 @@ class SkillGenerator:
     Generates SKILL code using Claude with structured prompting.
     """
 
-    def __init__(self):
-        self.client = anthropic.Anthropic()
-        self.model = "claude-sonnet-4-20250514"
+    def __init__(self, model: str = STRONG_MODEL, max_tokens: int = 2048):
+        """
+        Args:
+            model: Claude model used for generation
+            max_tokens: Output limit for generated code
+        """
+        self.model = model
+        self.max_tokens = max_tokens
+
+    @property
+    def client(self) -> anthropic.Anthropic:
+        """Shared, connection-pooled client (looked up per call, so configure_clients() applies)"""
+        return get_client()
+
+    @property
+    def async_client(self) -> anthropic.AsyncAnthropic:
+        """Shared async client of the running event loop"""
+        return get_async_client()
 
     def generate(
         self,
@@ -87,6 +111,48 @@ class SkillGenerator:
         Returns:
             dict with 'code', 'explanation', 'warnings'
         """
+        try:
+            response = self.client.messages.create(
+                **self._build_request(task_description, include_comments, include_error_handling)
+            )
+            return self._build_result(response)
+
+        except Exception as e:
+            return self._build_error(e)
+
+    async def agenerate(
+        self,
+        task_description: str,
+        include_comments: bool = True,
+        include_error_handling: bool = True
+    ) -> dict:
+        """
+        Async version of generate(), built on the AsyncAnthropic client.
+
+        Args:
+            task_description: What the code should do
+            include_comments: Add explanatory comments
+            include_error_handling: Add error handling code
+
+        Returns:
+            dict with 'code', 'explanation', 'warnings'
+        """
+        try:
+            response = await self.async_client.messages.create(
+                **self._build_request(task_description, include_comments, include_error_handling)
+            )
+            return self._build_result(response)
+
+        except Exception as e:
+            return self._build_error(e)
+
+    def _build_request(
+        self,
+        task_description: str,
+        include_comments: bool,
+        include_error_handling: bool
+    ) -> dict:
+        """Build the messages.create() arguments for a generation request"""
 
         system_prompt = """You are an expert SKILL programmer for Cadence Virtuoso.
 Generate clean, production-ready SKILL code.
@@ -121,34 +187,36 @@ Requirements:
 
 Return ONLY the SKILL code, nothing else."""
 
-        try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=2048,
-                temperature=0.1,  # Low temperature for consistent code
-                system=system_prompt,
-                messages=[{"role": "user", "content": user_prompt}]
-            )
-
-            code = response.content[0].text
-
-            # Basic validation
-            warnings = self._validate_skill_code(code)
-
-            return {
-                "status": "success",
-                "code": code,
-                "warnings": warnings,
-                "tokens_used": response.usage.input_tokens + response.usage.output_tokens
-            }
-
-        except Exception as e:
-            return {
-                "status": "error",
-                "error": str(e),
-                "code": None,
-                "warnings": []
-            }
+        return {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "temperature": 0.1,  # Low temperature for consistent code
+            "system": system_prompt,
+            "messages": [{"role": "user", "content": user_prompt}]
+        }
+
+    def _build_result(self, response) -> dict:
+        """Turn a Claude response into the tool result dict"""
+        code = response.content[0].text
+
+        # Basic validation
+        warnings = self._validate_skill_code(code)
+
+        return {
+            "status": "success",
+            "code": code,
+            "warnings": warnings,
+            "tokens_used": response.usage.input_tokens + response.usage.output_tokens
+        }
+
+    def _build_error(self, error: Exception) -> dict:
+        """Tool result dict for a failed generation"""
+        return {
+            "status": "error",
+            "error": str(error),
+            "code": None,
+            "warnings": []
+        }
 
     def _validate_skill_code(self, code: str) -> list[str]:
         """Basic validation of generated SKILL code"""
@@ -191,6 +259,9 @@ Explain:
         return response.content[0].text
 
 
+BACKENDS.register("skill_generator", SkillGenerator)
+
+
 # Tool definition for agent integration
 SKILL_GENERATOR_TOOL = {
     "name": "generate_skill_code",
@@ -220,7 +291,7 @@ SKILL_GENERATOR_TOOL = {
 
 def handle_tool_call(tool_input: dict) -> str:
     """Handler for agent tool calls"""
-    generator = SkillGenerator()
+    generator = BACKENDS.get("skill_generator")
     result = generator.generate(
         task_description=tool_input["task_description"],
         include_comments=tool_input.get("include_comments", True),
@@ -229,6 +300,34 @@ def handle_tool_call(tool_input: dict) -> str:
     return json.dumps(result, indent=2)
 
 
+def format_tool_result(result: str) -> Optional[str]:
+    """
+    Terminal formatter for generate_skill_code.
+
+    Returns the generated code as a markdown block (plus validation
+    warnings), or None if generation failed.
+    """
+    data = json.loads(result)
+    if data.get("status") != "success":
+        return None
+
+    answer = f"```skill\n{data['code'].strip()}\n```"
+    if data.get("warnings"):
+        answer += "\n\nWarnings:\n" + "\n".join(f"- {w}" for w in data["warnings"])
+    return answer
+
+
+async def ahandle_tool_call(tool_input: dict) -> str:
+    """Async handler for agent tool calls"""
+    generator = BACKENDS.get("skill_generator")
+    result = await generator.agenerate(
+        task_description=tool_input["task_description"],
+        include_comments=tool_input.get("include_comments", True),
+        include_error_handling=tool_input.get("include_error_handling", True)
+    )
+    return json.dumps(result, indent=2)
+
+
 # Demo
 if __name__ == "__main__":
     generator = SkillGenerator()
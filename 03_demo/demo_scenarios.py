@@ -141,6 +141,13 @@ def scenario_4_multi_turn():
         copilot.chat(query, verbose=True)
         print("\n" + "-" * 50)
 
+    # Later turns should mostly be read from the prompt cache
+    usage = copilot.get_usage_summary()
+    print(f"\nAPI calls: {usage['api_calls']}")
+    print(f"Cache read tokens: {usage['cache_read_input_tokens']}")
+    print(f"Cache write tokens: {usage['cache_creation_input_tokens']}")
+    print(f"Cache hit ratio: {usage['cache_hit_ratio']:.0%}")
+
     return copilot
 
 